@@ -0,0 +1,61 @@
+import threading
+import time
+from typing import List, Dict, Any, Callable, Optional
+
+class ReadingBus:
+    """
+    Publish/subscribe hub for sensor sweeps.
+    SensorManager publishes each completed sweep once; subscribers (LEDs,
+    history, SSE stream, ...) are called right away on the publishing thread.
+    Subscribers registered with changes_only=True are skipped when a sweep is
+    identical to the previous one. `generation` increments on every change
+    and can be used as a cache key for anything derived from the readings.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []  # (name, callback, changes_only)
+        self.generation = 0
+        self._latest: List[Dict[str, Any]] = []
+        self._latest_time = 0.0
+
+    def subscribe(self, callback: Callable[[List[Dict[str, Any]], float], None],
+                  changes_only: bool = False, replay: bool = False, name: Optional[str] = None):
+        """
+        Register callback(readings, timestamp).
+        With replay=True the last published sweep (if any) is delivered immediately,
+        so late subscribers don't wait a full poll interval for their first data.
+        """
+        with self._lock:
+            self._subscribers.append((name or getattr(callback, "__qualname__", "subscriber"), callback, changes_only))
+            latest, latest_time = self._latest, self._latest_time
+        if replay and latest:
+            self._deliver(name, callback, latest, latest_time)
+
+    def publish(self, readings: List[Dict[str, Any]], timestamp: Optional[float] = None) -> bool:
+        """Deliver a sweep to subscribers. Returns True if it differed from the previous one."""
+        timestamp = timestamp or time.time()
+        with self._lock:
+            changed = readings != self._latest
+            if changed:
+                self.generation += 1
+                self._latest = readings
+            self._latest_time = timestamp
+            subscribers = list(self._subscribers)
+
+        for name, callback, changes_only in subscribers:
+            if changes_only and not changed:
+                continue
+            self._deliver(name, callback, readings, timestamp)
+        return changed
+
+    def latest(self):
+        """(generation, readings, timestamp) of the last published sweep."""
+        with self._lock:
+            return self.generation, self._latest, self._latest_time
+
+    @staticmethod
+    def _deliver(name, callback, readings, timestamp):
+        try:
+            callback(readings, timestamp)
+        except Exception as e:
+            print(f"[Bus] Subscriber '{name}' error: {e}")
@@ -0,0 +1,33 @@
+import hashlib
+import json
+from typing import Any, Callable, Hashable
+
+from fastapi import Request, Response
+
+class ResponseCache:
+    """
+    Pre-serialized JSON response for a read-mostly endpoint.
+    The body is rebuilt only when `key` changes (e.g. the sensor sweep
+    generation); otherwise requests are served the cached bytes, or a
+    304 if the client already holds the same ETag.
+    """
+    def __init__(self, build: Callable[[], Any]):
+        self._build = build
+        # (key, body, etag) swapped as one tuple, so readers never see a mix
+        self._entry = (object(), b"", "")
+
+    def get(self, key: Hashable):
+        entry = self._entry
+        if entry[0] != key:
+            body = json.dumps(self._build(), separators=(",", ":")).encode()
+            etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+            entry = (key, body, etag)
+            self._entry = entry
+        return entry[1], entry[2]
+
+    def respond(self, request: Request, key: Hashable) -> Response:
+        body, etag = self.get(key)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
@@ -1,9 +1,22 @@
+import copy
 import json
 import os
-from typing import Dict, Any
+import threading
+import time
+import atexit
+from types import MappingProxyType
+from typing import Dict, Any, Callable, Mapping, NamedTuple, Optional
+from logs import get_logger
+
+log = get_logger("config")
 
 CONFIG_FILE = "config.json"
 
+# Writes arriving within this window are batched into one save
+SAVE_DEBOUNCE = 1.0
+# ...but a steady stream of changes (e.g. a slider drag) is still saved this often
+SAVE_MAX_DELAY = 5.0
+
 DEFAULT_CONFIG = {
     "temp_unit": "F",
     "temp_thresholds": {
@@ -24,19 +37,91 @@ DEFAULT_CONFIG = {
         "timezone": "UTC"
     },
     "mock_mode": False,
-    "sensor_order": []
+    "sensor_order": [],
+    "sensor_slots": 5, # Number of probe slots shown/read (any count, across all w1 buses)
+    "led_count": 8,
+    "led_map": [], # Optional: led_map[physical LED] = slot index (-1 = off). Empty = one LED per slot, reversed
+    "led_color_mode": "status", # "status" = fixed color per status, "gradient" = green->orange->red by temperature
+    "led_critical_effect": "flash", # "flash" or "pulse" (breathing)
+    "led_gamma": 1.0, # 2.2 gives perceptually even fades on WS2812
+    "history_retention_days": 30, # Raw 5s samples and 1m rollups
+    "history_rollup_retention_days": 365, # 1h min/max/avg rollups (15m ones: up to 90 days)
+    "sampling": {
+        # Per-probe rate/resolution by proximity to warning and rate of change.
+        # Tuning keys (intervals, resolutions, margins): see scheduler.DEFAULT_SAMPLING
+        "adaptive": True
+    },
+    "fleet": {
+        # Aggregator mode: other nodes to merge into /api/fleet, as URLs or {"url", "name"}.
+        # Tuning keys (interval, timeout): see fleet.DEFAULT_FLEET
+        "peers": []
+    }
 }
 
+def _to_fahrenheit(temp_c: float) -> float:
+    return (temp_c * 9/5) + 32
+
+def _identity(temp_c: float) -> float:
+    return temp_c
+
+class SensorProfile(NamedTuple):
+    name: Optional[str] # None = use the slot's default "Probe N"
+    warning: float
+    critical: float
+
+    def status(self, temp: float) -> str:
+        if temp >= self.critical:
+            return "critical"
+        elif temp >= self.warning:
+            return "warning"
+        else:
+            return "normal"
+
+class ConfigSnapshot(NamedTuple):
+    """
+    Immutable, precompiled view of the settings the sensor hot path needs.
+    Built once per config change and swapped in as a single reference, so a
+    reading costs one dict lookup and never sees a half-updated config.
+    """
+    unit: str
+    convert: Callable[[float], float] # Celsius -> display unit
+    slots: int
+    default: SensorProfile
+    sensors: Mapping[str, SensorProfile]
+
+    def profile(self, sensor_id: str) -> SensorProfile:
+        return self.sensors.get(sensor_id, self.default)
+
 class ConfigManager:
-    def __init__(self):
-        self._config = DEFAULT_CONFIG.copy()
+    """
+    In-memory config with debounced, atomic persistence.
+    Mutations happen under `lock`; save() only marks the config dirty and a
+    background writer flushes it (temp file + fsync + rename) once no new
+    change has arrived for SAVE_DEBOUNCE seconds. Callers never wait on disk.
+    """
+    def __init__(self, path: str = None, debounce: float = SAVE_DEBOUNCE):
+        self.path = path or CONFIG_FILE
+        self.debounce = debounce
+        self.lock = threading.RLock()
+        self.write_count = 0
+        self._config = copy.deepcopy(DEFAULT_CONFIG)
+        self._dirty = False
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._write_lock = threading.Lock() # One writer of the temp file at a time
+        # Each serialized snapshot is numbered; an older one never overwrites a newer one on disk
+        self._pending = (0, None) # (generation, json) of the latest snapshot
+        self._written = 0 # Generation of the snapshot on disk
+        self._wakeup = threading.Condition(self.lock)
+        self._writer = None
         self.load()
 
     def load(self):
-        if os.path.exists(CONFIG_FILE):
+        if os.path.exists(self.path):
             try:
-                with open(CONFIG_FILE, "r") as f:
+                with open(self.path, "r") as f:
                     saved = json.load(f)
+                with self.lock:
                     self._recursive_update(self._config, saved)
             except Exception as e:
                 print(f"Error loading config: {e}")
@@ -49,29 +134,120 @@ class ConfigManager:
                 base[k] = v
 
     def save(self):
+        """Schedule a write. Returns immediately; see flush() for a synchronous write."""
+        with self.lock:
+            now = time.monotonic()
+            if not self._dirty:
+                self._first_change = now
+            self._dirty = True
+            self._last_change = now
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True, name="config-writer")
+                self._writer.start()
+            self._wakeup.notify()
+
+    def flush(self):
+        """Write pending changes now (shutdown, tests)."""
+        with self.lock:
+            if self._dirty:
+                self._serialize()
+        # Also lands a snapshot the background writer took but hasn't written yet
+        self._write_pending()
+
+    def _writer_loop(self):
+        while True:
+            with self.lock:
+                while not self._dirty:
+                    self._wakeup.wait()
+                # Debounce: wait until changes stop arriving
+                while True:
+                    due = min(self._last_change + self.debounce, self._first_change + SAVE_MAX_DELAY)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                if not self._dirty: # flush() got there first
+                    continue
+                self._serialize()
+            self._write_pending()
+
+    def _serialize(self):
+        """Snapshot the config as JSON (caller holds `lock`, so never a half-updated dict)."""
+        self._dirty = False
+        self._pending = (self._pending[0] + 1, json.dumps(self._config, indent=4))
+
+    def _write_pending(self):
+        """Write the latest snapshot unless it (or a newer one) is already on disk."""
+        with self._write_lock:
+            with self.lock:
+                generation, data = self._pending
+            if generation > self._written and self._write_locked(f"{self.path}.tmp", data):
+                self._written = generation
+
+    def _write_locked(self, tmp_path: str, data: str) -> bool:
         try:
-            with open(CONFIG_FILE, "w") as f:
-                json.dump(self._config, f, indent=4)
-        except Exception as e:
-            print(f"Error saving config: {e}")
+            with open(tmp_path, "w") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            # Persist the rename itself
+            dir_fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
             try:
-                with open("backend_debug.log", "a") as logf:
-                    logf.write(f"CONFIG SAVE ERROR: {e}\n")
-            except: pass
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+            self.write_count += 1
+            return True
+        except Exception as e:
+            log.error("Config save failed", extra={"fields": {"path": self.path, "error": e}})
+            return False
 
     def get(self, key: str, default: Any = None) -> Any:
         return self._config.get(key, default)
 
     def set(self, key: str, value: Any):
-        self._config[key] = value
-        self.save()
+        with self.lock:
+            self._config[key] = value
+            self.save()
 
     def get_all(self) -> Dict[str, Any]:
         return self._config
 
     def update_all(self, new_config: Dict[str, Any]):
-        self._recursive_update(self._config, new_config)
-        self.save()
+        with self.lock:
+            self._recursive_update(self._config, new_config)
+            self.save()
+
+    def snapshot(self) -> ConfigSnapshot:
+        """Compile the current config into a ConfigSnapshot."""
+        with self.lock:
+            unit = self._config.get("temp_unit", "F")
+            thresholds = self._config["temp_thresholds"]
+            glob = thresholds.get("global", thresholds)
+            names = dict(self._config.get("sensor_names") or {})
+            overrides = dict(thresholds.get("sensors") or {})
+            try:
+                slots = max(1, int(self._config.get("sensor_slots", 5)))
+            except (TypeError, ValueError):
+                slots = 5
+
+        default = SensorProfile(None, float(glob["warning"]), float(glob["critical"]))
+        sensors = {}
+        for sensor_id in set(names) | set(overrides):
+            t = overrides.get(sensor_id, glob)
+            sensors[sensor_id] = SensorProfile(
+                names.get(sensor_id),
+                float(t.get("warning", default.warning)),
+                float(t.get("critical", default.critical))
+            )
+        return ConfigSnapshot(
+            unit=unit,
+            convert=_to_fahrenheit if unit == "F" else _identity,
+            slots=slots,
+            default=default,
+            sensors=MappingProxyType(sensors)
+        )
 
     def get_thresholds(self, sensor_id: str) -> Dict[str, float]:
         """Get thresholds for a specific sensor, falling back to global if not set."""
@@ -85,3 +261,4 @@ class ConfigManager:
         return base["global"]
 
 CONFIG = ConfigManager()
+atexit.register(CONFIG.flush)
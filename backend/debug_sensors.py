@@ -27,6 +27,7 @@ try:
     print(f"    Sensors Detected: {len(mgr.sensors)}")
     for s in mgr.sensors:
         print(f"      -> Sensor Obj: {s} (ID: {getattr(s, 'id', 'Unknown')})")
+    print(f"    Bulk Conversion Masters: {mgr._bulk_masters or 'none (per-device w1_slave reads)'}")
     
     print("\n[3] Testing Temperature Read (get_temperatures)...")
     readings = mgr.get_temperatures()
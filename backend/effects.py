@@ -0,0 +1,173 @@
+import math
+import time
+
+# NumPy is optional: whole-frame math is vectorized when available and falls
+# back to a per-LED loop otherwise (same output).
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except Exception:
+    HAS_NUMPY = False
+
+# Per-LED animation modes
+STEADY = 0
+FLASH = 1 # Hard bright/dim toggle every FLASH_INTERVAL
+PULSE = 2 # Smooth sine "breathing"
+
+FLASH_INTERVAL = 0.5
+FLASH_DIM = 50 / 255 # Dim instead of full off
+PULSE_PERIOD = 2.0
+PULSE_MIN = 0.2
+FADE_TIME = 0.8 # Seconds for an eased transition between two colors
+FRAME_RATE = 30 # While anything fades or pulses
+
+# Temperature gradient stops (display units, relative to the sensor's thresholds)
+GRADIENT_COOL = (0, 255, 0) # At/below warning - GRADIENT_SPAN
+GRADIENT_WARM = (255, 140, 0) # At warning
+GRADIENT_HOT = (255, 0, 0) # At/above critical
+GRADIENT_SPAN = 10.0
+
+def _lerp_color(a, b, t):
+    return tuple(int(round(a[i] + (b[i] - a[i]) * t)) for i in range(3))
+
+def gradient_color(temp: float, warning: float, critical: float):
+    """Green -> orange (at warning) -> red (at critical)."""
+    cool = warning - GRADIENT_SPAN
+    if temp <= cool:
+        return GRADIENT_COOL
+    if temp < warning:
+        return _lerp_color(GRADIENT_COOL, GRADIENT_WARM, (temp - cool) / GRADIENT_SPAN)
+    if temp < critical and critical > warning:
+        return _lerp_color(GRADIENT_WARM, GRADIENT_HOT, (temp - warning) / (critical - warning))
+    return GRADIENT_HOT
+
+def _smoothstep(p):
+    return p * p * (3 - 2 * p)
+
+class EffectEngine:
+    """
+    Computes whole LED frames from per-LED target colors and modes.
+    set_targets() starts an eased fade for every LED whose target changed;
+    render(now) returns the gamma-corrected frame for that instant;
+    next_delay(now) says when the frame will next change (None = static).
+    """
+    def __init__(self, led_count: int, gamma: float = 1.0):
+        self.gamma = gamma
+        self._lut = [int(round(255 * ((i / 255) ** gamma))) for i in range(256)]
+        self.resize(led_count)
+
+    def resize(self, led_count: int):
+        self.led_count = led_count
+        if HAS_NUMPY:
+            self._lut_np = np.array(self._lut, dtype=np.uint8)
+            self._from = np.zeros((led_count, 3), dtype=np.float32)
+            self._to = np.zeros((led_count, 3), dtype=np.float32)
+            self._start = np.zeros(led_count, dtype=np.float64)
+            self._modes = np.zeros(led_count, dtype=np.int8)
+        else:
+            self._from = [(0.0, 0.0, 0.0)] * led_count
+            self._to = [(0.0, 0.0, 0.0)] * led_count
+            self._start = [0.0] * led_count
+            self._modes = [STEADY] * led_count
+        self._fade_until = 0.0
+
+    def set_gamma(self, gamma: float):
+        if gamma != self.gamma:
+            self.gamma = gamma
+            self._lut = [int(round(255 * ((i / 255) ** gamma))) for i in range(256)]
+            if HAS_NUMPY:
+                self._lut_np = np.array(self._lut, dtype=np.uint8)
+
+    def set_targets(self, colors, modes, now: float = None):
+        """colors: [(r, g, b)] per LED, modes: [STEADY|FLASH|PULSE] per LED."""
+        now = time.monotonic() if now is None else now
+        n = self.led_count
+        if HAS_NUMPY:
+            to = np.asarray(colors[:n], dtype=np.float32).reshape(-1, 3)
+            changed = np.any(to != self._to, axis=1)
+            if changed.any():
+                # Fade from whatever is showing right now
+                self._from[changed] = self._base(now)[changed]
+                self._to[changed] = to[changed]
+                self._start[changed] = now
+                self._fade_until = now + FADE_TIME
+            self._modes = np.asarray(modes[:n], dtype=np.int8)
+        else:
+            base = self._base(now)
+            for i in range(n):
+                target = tuple(float(c) for c in colors[i])
+                if target != self._to[i]:
+                    self._from[i] = base[i]
+                    self._to[i] = target
+                    self._start[i] = now
+                    self._fade_until = now + FADE_TIME
+            self._modes = list(modes[:n])
+
+    def _base(self, now: float):
+        """Faded (pre-effect, pre-gamma) color of every LED at `now`."""
+        if HAS_NUMPY:
+            p = np.clip((now - self._start) / FADE_TIME, 0.0, 1.0).astype(np.float32)
+            e = _smoothstep(p)[:, None]
+            return self._from + (self._to - self._from) * e
+        out = []
+        for i in range(self.led_count):
+            e = _smoothstep(min(1.0, max(0.0, (now - self._start[i]) / FADE_TIME)))
+            f, t = self._from[i], self._to[i]
+            out.append((f[0] + (t[0] - f[0]) * e, f[1] + (t[1] - f[1]) * e, f[2] + (t[2] - f[2]) * e))
+        return out
+
+    @staticmethod
+    def _scales(now: float):
+        flash_on = int(now / FLASH_INTERVAL) % 2 == 0
+        flash = 1.0 if flash_on else FLASH_DIM
+        pulse = PULSE_MIN + (1 - PULSE_MIN) * (0.5 + 0.5 * math.cos(2 * math.pi * now / PULSE_PERIOD))
+        return flash, pulse
+
+    def render(self, now: float = None):
+        """Frame at `now`: uint8 array [leds, 3] with NumPy, else a list of (r, g, b)."""
+        now = time.monotonic() if now is None else now
+        flash, pulse = self._scales(now)
+        base = self._base(now)
+        if HAS_NUMPY:
+            scale = np.ones(self.led_count, dtype=np.float32)
+            scale[self._modes == FLASH] = flash
+            scale[self._modes == PULSE] = pulse
+            rgb = np.clip(base * scale[:, None], 0, 255).astype(np.uint8)
+            return self._lut_np[rgb]
+        lut = self._lut
+        frame = []
+        for i, (r, g, b) in enumerate(base):
+            mode = self._modes[i]
+            s = flash if mode == FLASH else pulse if mode == PULSE else 1.0
+            frame.append((lut[int(min(255, r * s))], lut[int(min(255, g * s))], lut[int(min(255, b * s))]))
+        return frame
+
+    def next_delay(self, now: float = None):
+        """Seconds until the frame changes on its own, or None if it is static."""
+        now = time.monotonic() if now is None else now
+        if HAS_NUMPY:
+            pulsing = bool(np.any(self._modes == PULSE))
+            flashing = bool(np.any(self._modes == FLASH))
+        else:
+            pulsing = PULSE in self._modes
+            flashing = FLASH in self._modes
+        if pulsing or now < self._fade_until:
+            return 1.0 / FRAME_RATE
+        if flashing:
+            # Sleep exactly to the next bright/dim keyframe
+            return FLASH_INTERVAL - (now % FLASH_INTERVAL) + 0.001
+        return None
+
+    @staticmethod
+    def dirty(frame, last):
+        """Indices of LEDs that differ between two frames."""
+        if len(frame) != len(last):
+            return list(range(len(frame)))
+        if HAS_NUMPY:
+            return np.flatnonzero(np.any(frame != last, axis=1)).tolist()
+        return [i for i in range(len(frame)) if frame[i] != last[i]]
+
+    @staticmethod
+    def pixel(frame, i):
+        r, g, b = frame[i]
+        return (int(r), int(g), int(b))
@@ -0,0 +1,120 @@
+"""
+Validation between raw 1-Wire reads and everything downstream.
+
+A DS18B20 can return a wrong value without failing its CRC:
+  85.000   - power-on reset value, read back after a brown-out or a
+             conversion that never ran (loose wire, weak parasite power)
+  -127.000 - what the libraries report for a probe that stopped answering
+  spikes   - a one-off bit flip on a noisy line
+ReadingFilter accepts or rejects each read in O(1). A rejected (or failed)
+read keeps the probe's last good value on display, flagged stale, until
+HOLD_LIMIT passes; only then does the probe show as an error.
+All temperatures are in degrees Celsius.
+"""
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+POWER_ON_C = 85.0
+DISCONNECTED_C = -127.0
+# DS18B20 measuring range
+MIN_C, MAX_C = -55.0, 125.0
+
+# A jump larger than SPIKE_STEP + SPIKE_RATE * seconds since the last good
+# read is held back until the next read confirms it
+SPIKE_STEP = 2.0
+SPIKE_RATE = 0.5 # C/s
+
+# How long a last good value may stand in for failed reads
+HOLD_LIMIT = 60.0
+
+# Rejection reasons (also the "kind" label of rack_sensor_read_errors_total)
+SENTINEL, OUT_OF_RANGE, SPIKE = "sentinel", "range", "spike"
+
+class ProbeState:
+    __slots__ = ("temp", "time", "candidate", "failing_since")
+
+    def __init__(self):
+        self.temp = None # Last good reading
+        self.time = 0.0
+        self.candidate = None # Unconfirmed jump
+        self.failing_since = None
+
+class ReadingFilter:
+    def __init__(self, hold_limit: float = HOLD_LIMIT):
+        self.hold_limit = hold_limit
+        self._probes: Dict[str, ProbeState] = {}
+
+    def _get(self, sensor_id: str) -> ProbeState:
+        state = self._probes.get(sensor_id)
+        if state is None:
+            state = self._probes[sensor_id] = ProbeState()
+        return state
+
+    def implausible(self, sensor_id: str, temp_c: float) -> Optional[str]:
+        """
+        Why a raw read can't be real, or None. Stateless, so a failed read
+        can be retried right away. 85.0 passes only if the probe was
+        already reading close to it.
+        """
+        if temp_c == DISCONNECTED_C:
+            return SENTINEL
+        if not MIN_C <= temp_c <= MAX_C:
+            return OUT_OF_RANGE
+        if temp_c == POWER_ON_C:
+            state = self._probes.get(sensor_id)
+            if state is None or state.temp is None or POWER_ON_C - state.temp > SPIKE_STEP:
+                return SENTINEL
+        return None
+
+    def check(self, sensor_id: str, temp_c: float, now: float = None) -> Optional[str]:
+        """Accept a read (returns None) or return the reason it was rejected."""
+        now = time.time() if now is None else now
+        reason = self.implausible(sensor_id, temp_c)
+        state = self._get(sensor_id)
+        if reason is None and state.temp is not None and now - state.time < self.hold_limit:
+            bound = SPIKE_STEP + SPIKE_RATE * (now - state.time)
+            if abs(temp_c - state.temp) > bound:
+                # A real step shows up again on the next read; a spike doesn't
+                confirmed = state.candidate is not None and abs(temp_c - state.candidate) <= SPIKE_STEP
+                state.candidate = None if confirmed else temp_c
+                if not confirmed:
+                    reason = SPIKE
+        if reason:
+            self.fail(sensor_id, now)
+            return reason
+        state.temp, state.time = temp_c, now
+        state.candidate = state.failing_since = None
+        return None
+
+    def fail(self, sensor_id: str, now: float = None):
+        """Account a read that raised (CRC error, I/O error)."""
+        state = self._get(sensor_id)
+        if state.failing_since is None:
+            state.failing_since = time.time() if now is None else now
+
+    def healthy(self, sensor_id: str) -> bool:
+        """True if the probe's previous read was good (worth retrying a failure right away)."""
+        state = self._probes.get(sensor_id)
+        return state is not None and state.temp is not None and state.failing_since is None
+
+    def held(self, sensor_id: str, now: float = None) -> Tuple[Optional[float], bool, bool]:
+        """
+        (last good temp or None, stale, expired) for display.
+        stale: the latest read was rejected/failed; expired: for longer than hold_limit.
+        """
+        state = self._probes.get(sensor_id)
+        if state is None:
+            return None, False, False
+        if state.failing_since is None:
+            return state.temp, False, False
+        now = time.time() if now is None else now
+        return state.temp, True, now - state.failing_since >= self.hold_limit
+
+    def forget(self, keep: Iterable[str]):
+        keep = set(keep)
+        for sensor_id in [s for s in self._probes if s not in keep]:
+            del self._probes[sensor_id]
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {sid: {"temp": s.temp, "last_good": s.time or None, "failing_since": s.failing_since}
+                for sid, s in self._probes.items()}
@@ -0,0 +1,257 @@
+"""
+Multi-rack aggregation.
+
+A node with fleet.peers configured also polls other RackDashboard nodes
+and serves them merged at /api/fleet (and /api/fleet/history), so a room
+of racks costs each client one request. Every interval all peers are
+polled at once over a pooled keep-alive session with If-None-Match: an
+unchanged peer answers 304 (no body, no parsing). Peer temperatures are
+converted to this node's unit; statuses are the peer's own (its thresholds).
+
+    "fleet": {"peers": ["http://rack-a.local:8000",
+                        {"url": "http://10.0.4.12:8000", "name": "rack-b"}]}
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import CONFIG
+from history import HistoryStore
+from logs import get_logger
+from metrics import FLEET_FETCH_SECONDS, FLEET_FETCH_FAILURES, FLEET_PEERS_ONLINE
+
+log = get_logger("fleet")
+
+FLEET_HISTORY_FILE = "fleet_history.db"
+
+DEFAULT_FLEET = {
+    "peers": [],
+    "interval": 2.0, # Seconds between polls
+    "timeout": 1.5, # Per request; a dead peer never delays the others past this
+}
+
+# Threads are spawned lazily, so this only caps very large rooms
+MAX_FETCH_WORKERS = 32
+
+STATUS_PATH = "/api/status"
+
+# Statuses with a real temperature; the others carry a placeholder that is never converted
+MEASURED = ("normal", "warning", "critical")
+
+# Peers answering 304 don't bump the generation; a cached view() is rebuilt
+# at least this often so their last_seen/latency_ms don't freeze
+VIEW_REFRESH = 10
+
+def peer_config(peer) -> Dict[str, str]:
+    """{"url", "name"} from a URL string or dict; name defaults to the host."""
+    if isinstance(peer, str):
+        peer = {"url": peer}
+    url = peer["url"].rstrip("/")
+    if "://" not in url:
+        url = "http://" + url
+    return {"url": url, "name": peer.get("name") or urlparse(url).hostname or url}
+
+def _converter(from_unit: Optional[str], to_unit: str):
+    if not from_unit or from_unit == to_unit:
+        return lambda t: t
+    if to_unit == "F":
+        return lambda t: round(t * 9 / 5 + 32, 1)
+    return lambda t: round((t - 32) * 5 / 9, 1)
+
+class Peer:
+    __slots__ = ("name", "url", "etag", "unit", "sensors", "last_seen", "error", "latency")
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.etag = None
+        self.unit = None
+        self.sensors: List[Dict[str, Any]] = [] # As the peer reported them
+        self.last_seen = 0.0
+        self.error = None
+        self.latency = None
+
+class FleetManager:
+    def __init__(self, autostart: bool = True, history_path: str = FLEET_HISTORY_FILE):
+        self.history_path = history_path
+        self.history: Optional[HistoryStore] = None # Opened once peers are configured
+        self.peers: Dict[str, Peer] = {}
+        self.generation = 0 # Bumped whenever the merged view changes
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._session = requests.Session()
+        self._pool = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix="fleet-fetch")
+        self.running = True
+        self.reload_config()
+
+        self.poll_thread = threading.Thread(target=self._poll_loop, name="fleet", daemon=True)
+        if autostart:
+            self.poll_thread.start()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.peers)
+
+    def reload_config(self):
+        settings = dict(DEFAULT_FLEET)
+        settings.update(CONFIG.get("fleet") or {})
+        self.interval = float(settings["interval"])
+        self.timeout = float(settings["timeout"])
+        configured = [peer_config(p) for p in settings["peers"]]
+
+        # One kept-alive connection per peer, reused by every poll
+        adapter = HTTPAdapter(pool_connections=max(1, len(configured)), pool_maxsize=2)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        with self._lock:
+            old = self.peers
+            self.peers = {}
+            for p in configured:
+                peer = old.get(p["name"])
+                if peer is None or peer.url != p["url"]:
+                    peer = Peer(p["name"], p["url"])
+                self.peers[p["name"]] = peer
+            self.generation += 1
+        if self.peers and self.history is None:
+            self.history = HistoryStore(self.history_path)
+        self._wakeup.set()
+
+    def _fetch(self, peer: Peer):
+        """GET the peer's status. Returns its JSON, None if unchanged (304), or the exception."""
+        headers = {"If-None-Match": peer.etag} if peer.etag else {}
+        t0 = time.perf_counter()
+        try:
+            resp = self._session.get(peer.url + STATUS_PATH, headers=headers, timeout=self.timeout)
+            if resp.status_code == 304:
+                return None
+            resp.raise_for_status()
+            data = resp.json()
+            data["_etag"] = resp.headers.get("ETag")
+            return data
+        except Exception as e:
+            FLEET_FETCH_FAILURES.labels(peer.name).inc()
+            return e
+        finally:
+            peer.latency = time.perf_counter() - t0
+            FLEET_FETCH_SECONDS.labels(peer.name).observe(peer.latency)
+
+    def refresh(self) -> bool:
+        """Poll every peer concurrently. Returns True if the merged view changed."""
+        with self._lock:
+            peers = list(self.peers.values())
+        if not peers:
+            return False
+        results = list(self._pool.map(self._fetch, peers))
+        now = time.time()
+
+        changed = False
+        with self._lock:
+            for peer, result in zip(peers, results):
+                if isinstance(result, Exception):
+                    if peer.error is None:
+                        log.warning("Peer unreachable", extra={"fields": {"peer": peer.name, "error": result}})
+                        changed = True
+                    peer.error = str(result)
+                    continue
+                if peer.error is not None:
+                    log.info("Peer back online", extra={"fields": {"peer": peer.name}})
+                    changed = True
+                peer.error = None
+                peer.last_seen = now
+                if result is not None:
+                    peer.etag = result.pop("_etag", None)
+                    peer.unit = result.get("unit")
+                    peer.sensors = [s for s in result.get("sensors", []) if s.get("status") != "empty"]
+                    changed = True
+            if changed:
+                self.generation += 1
+            online = [p for p in peers if p.error is None]
+        FLEET_PEERS_ONLINE.set(len(online))
+
+        if self.history is not None:
+            self.history.record(self._fleet_readings(online), now)
+        return changed
+
+    def _fleet_readings(self, peers: List[Peer]) -> List[Dict[str, Any]]:
+        """Current readings of the given peers in this node's unit, ids prefixed "<peer>/"."""
+        unit = CONFIG.get("temp_unit")
+        readings = []
+        for peer in peers:
+            conv = _converter(peer.unit, unit)
+            for s in peer.sensors:
+                temp = conv(s["temp"]) if s["status"] in MEASURED else s["temp"]
+                readings.append({"id": f"{peer.name}/{s['id']}", "name": s.get("name"), "temp": temp,
+                                 "status": s["status"], "stale": s.get("stale", False)})
+        return readings
+
+    def view(self) -> Dict[str, Any]:
+        """Merged fleet status: one entry per peer plus a room-wide summary."""
+        unit = CONFIG.get("temp_unit")
+        with self._lock:
+            peers = list(self.peers.values())
+            generation = self.generation
+            entries = []
+            counts = {"normal": 0, "warning": 0, "critical": 0, "error": 0, "searching": 0}
+            hottest = None
+            for peer in peers:
+                conv = _converter(peer.unit, unit)
+                sensors = [dict(s, temp=conv(s["temp"])) if s["status"] in MEASURED else dict(s)
+                           for s in peer.sensors]
+                if peer.error is None:
+                    for s in sensors:
+                        counts[s["status"]] = counts.get(s["status"], 0) + 1
+                        if s["status"] in MEASURED and (hottest is None or s["temp"] > hottest["temp"]):
+                            hottest = {"peer": peer.name, "id": s["id"], "name": s.get("name"), "temp": s["temp"]}
+                entries.append({
+                    "name": peer.name,
+                    "url": peer.url,
+                    "online": peer.error is None and peer.last_seen > 0,
+                    "last_seen": peer.last_seen or None,
+                    "error": peer.error,
+                    "latency_ms": round(peer.latency * 1000, 1) if peer.latency is not None else None,
+                    "sensors": sensors,
+                })
+        return {
+            "generation": generation,
+            "unit": unit,
+            "peers": entries,
+            "summary": {"peers": len(entries), "online": sum(e["online"] for e in entries),
+                        "statuses": counts, "hottest": hottest},
+        }
+
+    def query_history(self, peer: Optional[str] = None, sensor: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """
+        HistoryStore.query over fleet samples; series ids are "<peer>/<sensor id>".
+        A sensor without a peer matches that probe id on every peer.
+        """
+        if self.history is None:
+            return {"series": {}, "unit": CONFIG.get("temp_unit")}
+        if peer and sensor:
+            return self.history.query(sensor=f"{peer}/{sensor}", **kwargs)
+        return self.history.query(prefix=f"{peer}/" if peer else None,
+                                  suffix=f"/{sensor}" if sensor else None, **kwargs)
+
+    def _poll_loop(self):
+        while self.running:
+            self._wakeup.clear()
+            t_start = time.time()
+            try:
+                self.refresh()
+            except Exception as e:
+                log.error("Fleet poll error", extra={"fields": {"error": e}})
+            # Without peers, sleep until reload_config()/close()
+            self._wakeup.wait(max(0.1, self.interval - (time.time() - t_start)) if self.peers else None)
+
+    def close(self):
+        self.running = False
+        self._wakeup.set()
+        self._pool.shutdown(wait=False)
+        self._session.close()
+        if self.history is not None:
+            self.history.close()
@@ -0,0 +1,210 @@
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from config import CONFIG
+
+HISTORY_FILE = "history.db"
+
+# Statuses that carry a real measurement worth keeping
+RECORDED_STATUSES = ("normal", "warning", "critical")
+
+# Default query window / target point count (matches the old 1h @ 10s graph)
+DEFAULT_WINDOW = 3600
+DEFAULT_POINTS = 360
+
+PRUNE_INTERVAL = 3600
+
+# Raw samples are stored at most this often, however often sweeps are published
+# (just under the 5s poll interval, so regular sweeps are never skipped)
+RECORD_INTERVAL = 4.5
+
+# Rollup bucket sizes (seconds): 1 minute, 15 minutes, 1 hour.
+# Each keeps min/max/sum/count and is updated incrementally on every write.
+ROLLUP_RESOLUTIONS = (60, 900, 3600)
+
+# 15m rollups are kept this long (capped by history_rollup_retention_days);
+# 1m rollups as long as raw samples, 1h rollups for history_rollup_retention_days
+MEDIUM_ROLLUP_RETENTION_DAYS = 90
+
+class HistoryStore:
+    """
+    On-disk time series of every sensor sweep (SQLite, WAL mode).
+    Samples are stored in Celsius so a unit switch doesn't corrupt history;
+    queries convert to the configured unit.
+    """
+    def __init__(self, path: str = HISTORY_FILE, min_interval: float = RECORD_INTERVAL):
+        self.path = path
+        self.min_interval = min_interval
+        self._last_record = 0
+        self._lock = threading.Lock()
+        self._sensor_keys = {} # sensor id -> integer key (keeps sample rows small)
+        self._last_prune = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._lock:
+            c = self._conn
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=NORMAL") # WAL: no fsync per commit
+            c.execute("CREATE TABLE IF NOT EXISTS sensors (key INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL)")
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS samples ("
+                " sensor INTEGER NOT NULL, ts INTEGER NOT NULL, temp REAL NOT NULL,"
+                " PRIMARY KEY (sensor, ts)) WITHOUT ROWID"
+            )
+            c.execute(
+                "CREATE TABLE IF NOT EXISTS rollups ("
+                " res INTEGER NOT NULL, sensor INTEGER NOT NULL, bucket INTEGER NOT NULL,"
+                " min REAL NOT NULL, max REAL NOT NULL, sum REAL NOT NULL, count INTEGER NOT NULL,"
+                " PRIMARY KEY (res, sensor, bucket)) WITHOUT ROWID"
+            )
+            c.commit()
+            for key, sensor_id in c.execute("SELECT key, id FROM sensors"):
+                self._sensor_keys[sensor_id] = key
+
+    def _key_for(self, sensor_id: str) -> int:
+        # Caller holds self._lock
+        key = self._sensor_keys.get(sensor_id)
+        if key is None:
+            self._conn.execute("INSERT OR IGNORE INTO sensors (id) VALUES (?)", (sensor_id,))
+            key = self._conn.execute("SELECT key FROM sensors WHERE id = ?", (sensor_id,)).fetchone()[0]
+            self._sensor_keys[sensor_id] = key
+        return key
+
+    @staticmethod
+    def _to_celsius(temp: float) -> float:
+        if CONFIG.get("temp_unit") == "F":
+            return round((temp - 32) * 5 / 9, 2)
+        return temp
+
+    @staticmethod
+    def _from_celsius(temp: float) -> float:
+        if CONFIG.get("temp_unit") == "F":
+            return round((temp * 9 / 5) + 32, 1)
+        return round(temp, 1)
+
+    def record(self, readings: List[Dict[str, Any]], timestamp: Optional[float] = None):
+        """Persist one sweep. Called from the sensor poll thread."""
+        now = timestamp or time.time()
+        # Adaptive sampling can publish every second; history keeps its 5s cadence
+        if now - self._last_record < self.min_interval:
+            return
+        self._last_record = now
+        ts = int(now)
+        try:
+            with self._lock:
+                rows = [(self._key_for(r["id"]), ts, self._to_celsius(r["temp"]))
+                        for r in readings if r.get("status") in RECORDED_STATUSES and not r.get("stale")]
+                if rows:
+                    self._conn.executemany("INSERT OR IGNORE INTO samples VALUES (?, ?, ?)", rows)
+                    self._conn.executemany(
+                        "INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?, 1)"
+                        " ON CONFLICT (res, sensor, bucket) DO UPDATE SET"
+                        " min = MIN(min, excluded.min), max = MAX(max, excluded.max),"
+                        " sum = sum + excluded.sum, count = count + 1",
+                        [(res, key, (ts // res) * res, temp, temp, temp)
+                         for key, ts, temp in rows for res in ROLLUP_RESOLUTIONS]
+                    )
+                self._conn.commit()
+            if ts - self._last_prune > PRUNE_INTERVAL:
+                self.prune(ts)
+        except Exception as e:
+            print(f"[History] Record error: {e}")
+
+    @staticmethod
+    def retention_cutoffs(now: int) -> Dict[int, int]:
+        """Oldest timestamp kept per resolution (0 = raw samples)."""
+        raw_days = CONFIG.get("history_retention_days", 30)
+        longest_days = CONFIG.get("history_rollup_retention_days", 365)
+        days = {0: raw_days, 60: raw_days, 900: min(MEDIUM_ROLLUP_RETENTION_DAYS, longest_days), 3600: longest_days}
+        return {res: now - int(d * 86400) for res, d in days.items()}
+
+    def prune(self, now: Optional[float] = None):
+        """Drop raw samples and each rollup resolution past its retention (see retention_cutoffs)."""
+        now = int(now or time.time())
+        self._last_prune = now
+        cutoffs = self.retention_cutoffs(now)
+        with self._lock:
+            for key in self._sensor_keys.values():
+                self._conn.execute("DELETE FROM samples WHERE sensor = ? AND ts < ?", (key, cutoffs[0]))
+                for res in ROLLUP_RESOLUTIONS:
+                    self._conn.execute("DELETE FROM rollups WHERE res = ? AND sensor = ? AND bucket < ?",
+                                       (res, key, cutoffs[res]))
+            self._conn.commit()
+
+    @staticmethod
+    def pick_resolution(step: int) -> int:
+        """Coarsest rollup that still gives at least one row per `step` bucket (0 = raw samples)."""
+        best = 0
+        for res in ROLLUP_RESOLUTIONS:
+            if res <= step:
+                best = res
+        return best
+
+    def query(self, sensor: Optional[str] = None, start: Optional[int] = None,
+              end: Optional[int] = None, step: Optional[int] = None,
+              points: Optional[int] = None, prefix: Optional[str] = None,
+              suffix: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Samples per `step`-second bucket between start and end, read from the
+        coarsest rollup that satisfies the step (or `points` per series), or
+        a coarser one if finer data for `start` has already been pruned.
+        Buckets are aligned to start; rollup queries round step down to a
+        multiple of the rollup resolution.
+        Without sensor, prefix/suffix limit the series to ids starting/ending with them.
+        Returns {"from", "to", "step", "resolution", "unit",
+                 "series": {sensor_id: [[ts, avg, min, max], ...]}}.
+        """
+        end = int(end or time.time())
+        start = int(start if start is not None else end - DEFAULT_WINDOW)
+        if not step or step <= 0:
+            step = max(1, (end - start) // (points or DEFAULT_POINTS))
+        step = int(step)
+        resolution = self.pick_resolution(step)
+        cutoffs = self.retention_cutoffs(int(time.time()))
+        for res in ROLLUP_RESOLUTIONS:
+            if res > resolution and start < cutoffs[resolution]:
+                resolution = res
+        if resolution:
+            step = max(resolution, step // resolution * resolution)
+
+        if resolution:
+            sql = ("SELECT ? + ((bucket - ?) / ?) * ? AS b, SUM(sum) / SUM(count), MIN(min), MAX(max) FROM rollups"
+                   " WHERE res = %d AND sensor = ? AND bucket >= ? AND bucket <= ?"
+                   " GROUP BY b ORDER BY b" % resolution)
+            # Include the rollup bucket that contains `start`
+            range_start = (start // resolution) * resolution
+        else:
+            sql = ("SELECT ? + ((ts - ?) / ?) * ? AS b, AVG(temp), MIN(temp), MAX(temp) FROM samples"
+                   " WHERE sensor = ? AND ts >= ? AND ts <= ?"
+                   " GROUP BY b ORDER BY b")
+            range_start = start
+
+        # One primary-key range scan per sensor
+        with self._lock:
+            if sensor:
+                keys = [(sensor, self._sensor_keys[sensor])] if sensor in self._sensor_keys else []
+            else:
+                keys = [(s, k) for s, k in self._sensor_keys.items()
+                        if (not prefix or s.startswith(prefix)) and (not suffix or s.endswith(suffix))]
+            series = {}
+            for sensor_id, key in keys:
+                rows = self._conn.execute(sql, (start, start, step, step, key, range_start, end)).fetchall()
+                if rows:
+                    conv = self._from_celsius
+                    series[sensor_id] = [[b, conv(avg), conv(lo), conv(hi)] for b, avg, lo, hi in rows]
+
+        return {
+            "from": start,
+            "to": end,
+            "step": step,
+            "resolution": resolution,
+            "unit": CONFIG.get("temp_unit"),
+            "series": series
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
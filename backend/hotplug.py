@@ -0,0 +1,82 @@
+"""
+1-Wire hot-plug detection.
+
+sysfs attributes don't raise inotify events when the kernel adds or drops a
+w1 slave, so DeviceWatcher listens to the kernel's uevent netlink socket
+(what udev itself reads) for add/remove events on the w1 subsystem. No
+extra dependency and no I/O until something is plugged or unplugged.
+Where that socket is unavailable (non-Linux, restricted containers) it
+falls back to a periodic rescan.
+"""
+import socket
+import threading
+import time
+
+from logs import get_logger
+
+log = get_logger("hotplug")
+
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+
+# Safety-net rescan when kernel events are available (missed events, driver reloads)
+FALLBACK_RESCAN_INTERVAL = 300.0
+# Rescan interval when they are not
+POLL_RESCAN_INTERVAL = 30.0
+
+def is_w1_event(data: bytes) -> bool:
+    """
+    True for a kernel uevent adding/removing a 1-Wire device, e.g.
+    b"add@/devices/w1_bus_master1/28-0000075fb7e5\\0ACTION=add\\0...SUBSYSTEM=w1\\0..."
+    """
+    header, _, env = data.partition(b"\0")
+    if not header.startswith((b"add@", b"remove@")):
+        return False
+    return b"SUBSYSTEM=w1\0" in env + b"\0" or b"/w1_bus_master" in header
+
+class DeviceWatcher:
+    """
+    Tells SensorManager when the device list may have changed.
+    rescan_due() is a flag check (no I/O); begin_scan() resets it.
+    """
+    def __init__(self, uevents: bool = True, fallback_interval: float = None):
+        self._changed = threading.Event()
+        self._last_scan = time.monotonic()
+        self.events = 0
+        self.listening = self._start_listener() if uevents else False
+        self.fallback_interval = fallback_interval or (
+            FALLBACK_RESCAN_INTERVAL if self.listening else POLL_RESCAN_INTERVAL)
+
+    def notify(self):
+        """Request a rescan on the next sweep (hot-plug event, vanished device, simulators)."""
+        self._changed.set()
+
+    def rescan_due(self) -> bool:
+        return self._changed.is_set() or time.monotonic() - self._last_scan >= self.fallback_interval
+
+    def begin_scan(self):
+        # Cleared before scanning, so an event during the scan triggers another one
+        self._changed.clear()
+        self._last_scan = time.monotonic()
+
+    def _start_listener(self) -> bool:
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, UEVENT_KERNEL_GROUP))
+        except (AttributeError, OSError) as e:
+            log.info("Kernel uevents unavailable, using periodic rescans", extra={"fields": {"error": e}})
+            return False
+        threading.Thread(target=self._listen, args=(sock,), name="w1-hotplug", daemon=True).start()
+        return True
+
+    def _listen(self, sock):
+        while True:
+            try:
+                data = sock.recv(16384)
+            except OSError as e:
+                log.error("Uevent socket closed, using periodic rescans", extra={"fields": {"error": e}})
+                self.fallback_interval = POLL_RESCAN_INTERVAL
+                return
+            if is_w1_event(data):
+                self.events += 1
+                self._changed.set()
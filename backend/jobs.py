@@ -0,0 +1,100 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from logs import get_logger
+
+log = get_logger("jobs")
+
+# Submissions arriving this close together are applied as one job
+COALESCE_WINDOW = 0.25
+# Finished jobs kept for status lookups
+MAX_FINISHED_JOBS = 50
+
+def _public(job):
+    return {k: (dict(v) if k == "changes" else v) for k, v in job.items() if k != "last_submit"}
+
+class JobQueue:
+    """
+    Applies change sets on a background thread and hands out job ids.
+    A submission made while a job is still queued is merged into it
+    (later values win) and gets the same id, so a burst of updates costs
+    one apply(). apply(changes) returns a status message or raises.
+    """
+    def __init__(self, apply: Callable[[Dict[str, Any]], str], coalesce: float = COALESCE_WINDOW,
+                 name: str = "jobs"):
+        self._apply = apply
+        self.coalesce = coalesce
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._pending: Optional[Dict[str, Any]] = None # Queued job, merged into by submit()
+        self._jobs = OrderedDict() # id -> job (public dict)
+        self._thread = threading.Thread(target=self._worker, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        with self._cond:
+            job = self._pending
+            if job is None:
+                job = {"id": str(next(self._ids)), "status": "queued", "message": "",
+                       "submitted": time.time(), "finished": None, "merged": 0, "changes": {}}
+                self._pending = job
+                self._jobs[job["id"]] = job
+                self._trim()
+            else:
+                job["merged"] += 1
+            job["changes"].update(changes)
+            job["last_submit"] = time.monotonic()
+            self._cond.notify()
+            return _public(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return _public(job) if job else None
+
+    def wait(self, job_id: str, timeout: float = None) -> Optional[Dict[str, Any]]:
+        """Block until the job has finished (for tests/tools)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job["status"] in ("done", "failed"):
+                    return _public(job) if job else None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return _public(job)
+                self._cond.wait(remaining)
+
+    def _trim(self):
+        finished = [jid for jid, j in self._jobs.items() if j["status"] in ("done", "failed")]
+        for jid in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[jid]
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                # Let a burst settle before taking the job off the queue
+                while True:
+                    quiet = self._pending["last_submit"] + self.coalesce - time.monotonic()
+                    if quiet <= 0:
+                        break
+                    self._cond.wait(quiet)
+                job = self._pending
+                self._pending = None
+                job["status"] = "running"
+                changes = dict(job["changes"])
+
+            try:
+                message, status = self._apply(changes), "done"
+            except Exception as e:
+                log.error("Job failed", extra={"fields": {"job": job["id"], "error": e}})
+                message, status = str(e), "failed"
+
+            with self._cond:
+                job.update(status=status, message=message, finished=time.time())
+                self._cond.notify_all()
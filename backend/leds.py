@@ -1,6 +1,11 @@
 import time
 import threading
 from config import CONFIG
+from effects import EffectEngine, gradient_color, STEADY, FLASH, PULSE
+from metrics import LED_FRAMES
+
+_FRAMES_PUSHED = LED_FRAMES.labels("pushed")
+_FRAMES_SKIPPED = LED_FRAMES.labels("skipped")
 
 # NeoPixel / Blinka Import
 try:
@@ -12,10 +17,11 @@ except Exception as e:
     print(f"NeoPixel/Blinka libraries not found: {e}. Using Mock LEDs.")
 
 class LEDManager:
-    def __init__(self):
+    def __init__(self, pixels=None):
+        # pixels: optional NeoPixel-compatible sink (e.g. simulators.FakeNeoPixel)
         self.mock_mode = CONFIG.get("mock_mode")
-        self.pixels = None
-        self.led_count = 8 # User specified 8 LEDs
+        self.pixels = pixels
+        self.led_count = self._configured_led_count()
         self.led_pin = None
         if HAS_LEDS:
             self.led_pin = board.D10 # GPIO 10 (SPI MOSI)
@@ -24,10 +30,24 @@ class LEDManager:
         self.current_brightness = float(CONFIG.get("led_brightness", 255)) / 255.0
         
         self.current_colors = [(0,0,0)] * self.led_count
+        self.slot_colors = [] # Color per sensor slot, in slot order
+        self._last_readings = [] # Last sweep, re-applied when the strip layout/colors change
+        self.colors_version = 0 # Bumped whenever slot/LED colors are recomputed
+        self._led_map = self._build_led_map()
+        self._config_snapshot = CONFIG.snapshot() # Thresholds for the gradient color mode
+        self.engine = EffectEngine(self.led_count, gamma=self._configured_gamma())
+        self._engine_lock = threading.Lock()
         self.running = True
         self.update_thread = None
+        self._wake = threading.Event()
+        self._frame = [] # Last frame pushed to the strip
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+        self._show_pending = False # Brightness changed: show() even if no pixel did
 
-        if not self.mock_mode and HAS_LEDS:
+        if self.pixels is not None:
+            self.mock_mode = False
+        elif not self.mock_mode and HAS_LEDS:
             self._init_real_leds()
         else:
             self.mock_mode = True
@@ -48,8 +68,72 @@ class LEDManager:
         if self.pixels:
             self.pixels.brightness = self.current_brightness
 
+    def set_brightness(self, value: int):
+        """Brightness-only update (HA slider): one strip refresh, no config reload."""
+        try:
+            self.led_brightness = value
+        except Exception as e:
+            print(f"Error setting brightness: {e}")
+            return
+        self._show_pending = True
+        self._wake.set()
+
+    @staticmethod
+    def _configured_led_count():
+        try:
+            return max(1, int(CONFIG.get("led_count", 8)))
+        except (TypeError, ValueError):
+            return 8
+
+    @staticmethod
+    def _configured_gamma():
+        try:
+            return max(0.1, float(CONFIG.get("led_gamma", 1.0)))
+        except (TypeError, ValueError):
+            return 1.0
+
+    def _build_led_map(self):
+        """
+        Physical LED index -> sensor slot index (-1 = off), resolved once.
+        Default: strip is mounted reversed, one LED per slot, and spare LEDs
+        repeat the last slot's color.
+        """
+        custom = CONFIG.get("led_map") or []
+        if custom:
+            return [int(custom[i]) if i < len(custom) else -1 for i in range(self.led_count)]
+
+        try:
+            last_slot = max(0, int(CONFIG.get("sensor_slots", 5)) - 1)
+        except (TypeError, ValueError):
+            last_slot = 4
+        led_map = [-1] * self.led_count
+        for i in range(self.led_count):
+            led_map[self.led_count - 1 - i] = min(i, last_slot)
+        return led_map
+
     def reload_config(self):
         new_mock = CONFIG.get("mock_mode")
+
+        # Strip length / mapping changes
+        new_count = self._configured_led_count()
+        if new_count != self.led_count:
+            self.led_count = new_count
+            self.current_colors = [(0,0,0)] * new_count
+            with self._engine_lock:
+                self.engine.resize(new_count)
+            if self.pixels:
+                try:
+                    self.pixels.deinit()
+                except Exception as e:
+                    print(f"Error releasing LEDs: {e}")
+                self.pixels = None
+                if not self.mock_mode:
+                    self._init_real_leds()
+        self._led_map = self._build_led_map()
+        self._config_snapshot = CONFIG.snapshot()
+        with self._engine_lock:
+            self.engine.set_gamma(self._configured_gamma())
+
         # Config stores 0-255, NeoPixel uses 0.0-1.0
         new_brightness_int = CONFIG.get("led_brightness", 255)
         new_brightness = float(new_brightness_int) / 255.0
@@ -59,6 +143,7 @@ class LEDManager:
             self.current_brightness = new_brightness
             try:
                 self.pixels.brightness = self.current_brightness
+                self._show_pending = True
             except Exception as e:
                 print(f"Error setting brightness: {e}")
 
@@ -69,6 +154,11 @@ class LEDManager:
                 self._init_real_leds()
         
         self.mock_mode = new_mock
+        # Sweeps are delivered on change only: lay the last one out again for the new
+        # count/map/thresholds rather than waiting (possibly long) for a reading to change
+        if self._last_readings:
+            self.update_from_sensors(self._last_readings)
+        self._wake.set() # Re-render with the new settings
 
     def _init_real_leds(self):
         try:
@@ -83,85 +173,102 @@ class LEDManager:
                 auto_write=False, 
                 pixel_order=neopixel.GRB # WS2812 is usually GRB
             )
+            self._frame = [] # New strip: first frame is a full redraw
             print(f"[LEDS] NeoPixel Initialized on D18 with {self.led_count} LEDs.")
         except Exception as e:
             print(f"Error initializing NeoPixel LEDs: {e}. Switching to Mock Mode.")
             self.mock_mode = True
 
-    def update_from_sensors(self, sensor_data):
-        # sensor_data is list of dicts from SensorManager
-        # Map each sensor status to a color
-        
-        # Reset all to off first? Or keep last state?
-        # We will overwrite indices 0..N based on sensors
-        
-        last_color = (0, 0, 0)
-        
-        for i in range(self.led_count):
-            # Physical LED index (Reversed)
-            target_idx = self.led_count - 1 - i
-            
-            color = (0, 0, 0)
-            
-            if i < len(sensor_data):
-                status = sensor_data[i]['status']
-                
-                # Default RGB colors
-                if status == "critical":
-                    color = (255, 0, 0) # Red
-                elif status == "warning":
-                    color = (255, 140, 0) # Orange
-                elif status == "normal":
-                    color = (0, 255, 0) # Green
-                elif status == "searching":
-                    color = (0, 0, 255) # Blue
-                elif status == "empty":
-                    color = (0, 0, 0) # Off
-                else:
-                    color = (0, 50, 50) # Dim Cyan for unknown
-                
-                last_color = color
+    def update_from_sensors(self, sensor_data, timestamp=None):
+        # sensor_data is list of dicts from SensorManager (one per slot)
+        # Map each slot to a color + effect, then lay slots out on the strip
+        gradient = CONFIG.get("led_color_mode") == "gradient"
+        critical_mode = PULSE if CONFIG.get("led_critical_effect") == "pulse" else FLASH
+        snap = self._config_snapshot
+
+        slot_colors = []
+        slot_modes = []
+        for r in sensor_data:
+            status = r['status']
+            if gradient and status in ("normal", "warning", "critical"):
+                profile = snap.profile(r['id'])
+                slot_colors.append(gradient_color(r['temp'], profile.warning, profile.critical))
             else:
-                # Fill remaining LEDs with the last known color
-                color = last_color
-            
-            self.current_colors[target_idx] = color
+                slot_colors.append(self._status_color(status))
+            slot_modes.append(critical_mode if status == "critical" else STEADY)
+        slot_count = len(slot_colors)
+        self._last_readings = sensor_data
+
+        colors = [(0, 0, 0)] * self.led_count
+        modes = [STEADY] * self.led_count
+        for led_idx, slot in enumerate(self._led_map[:self.led_count]):
+            if 0 <= slot < slot_count:
+                colors[led_idx] = slot_colors[slot]
+                modes[led_idx] = slot_modes[slot]
+
+        self.slot_colors = slot_colors
+        self.colors_version += 1
+        with self._engine_lock:
+            self.engine.set_targets(colors, modes)
+        self.current_colors = colors
+        self._wake.set() # Start the transition now, not on the next tick
+
+    @staticmethod
+    def _status_color(status):
+        # Default RGB colors
+        if status == "critical":
+            return (255, 0, 0) # Red
+        elif status == "warning":
+            return (255, 140, 0) # Orange
+        elif status == "normal":
+            return (0, 255, 0) # Green
+        elif status == "searching":
+            return (0, 0, 255) # Blue
+        elif status == "empty":
+            return (0, 0, 0) # Off
+        else:
+            return (0, 50, 50) # Dim Cyan for unknown
+
+    def _render(self, frame):
+        """Push only the pixels that differ from the last frame; skip show() if none do."""
+        dirty = self.engine.dirty(frame, self._frame)
+        if not dirty and not self._show_pending:
+            self.frames_skipped += 1
+            _FRAMES_SKIPPED.inc()
+            return
+
+        try:
+            for i in dirty:
+                self.pixels[i] = self.engine.pixel(frame, i)
+            self._show_pending = False
+            self.pixels.show()
+            self._frame = frame
+            self.frames_rendered += 1
+            _FRAMES_PUSHED.inc()
+        except Exception as e:
+            print(f"LED Update Error: {e}")
 
-        # If we have more LEDs than sensors, make the rest ...?
-        # Let's make them dim white (or off) for now. Use config?
-        # Leaving them 0,0,0 as initialized.
+    def get_render_stats(self):
+        return {"frames_rendered": self.frames_rendered, "frames_skipped": self.frames_skipped}
 
     def _animate_loop(self):
-        # Handle flashing for critical status
-        flash_state = True
+        # Effects (fades, pulse, critical flash) run at the engine's frame rate
+        # only while something animates; a static strip sleeps until woken.
         while self.running:
-            if self.mock_mode:
-                time.sleep(1)
-                continue
+            now = time.monotonic()
+            delay = None
+            if self.pixels and not self.mock_mode:
+                with self._engine_lock:
+                    frame = self.engine.render(now)
+                    delay = self.engine.next_delay(now)
+                self._render(frame)
 
-            # Real LED driving
-            if self.pixels:
-                try:
-                    for i in range(self.led_count):
-                        if i < len(self.current_colors):
-                            r, g, b = self.current_colors[i]
-                            
-                            # Flash effect for critical (Red)
-                            if r == 255 and g == 0 and b == 0:
-                                if not flash_state:
-                                    r, g, b = 50, 0, 0 # Dim instead of full off
-                            
-                            self.pixels[i] = (r, g, b)
-                    
-                    self.pixels.show()
-                except Exception as e:
-                    print(f"LED Update Error: {e}")
-            
-            flash_state = not flash_state
-            time.sleep(0.5)
+            self._wake.wait(delay)
+            self._wake.clear()
 
     def cleanup(self):
         self.running = False
+        self._wake.set()
         if self.pixels:
             try:
                 self.pixels.fill((0, 0, 0))
@@ -0,0 +1,108 @@
+"""
+Queue-backed logging for the backend.
+
+Callers only format a record and put it on a queue; a background listener
+thread does the console and file I/O. The file (backend_debug.log) is
+size-rotated, and identical messages repeated within RATE_LIMIT_WINDOW are
+collapsed into one line plus a "repeats" count, so a flaky probe no
+longer costs an SD-card write every sweep.
+
+    log = get_logger("sensors")
+    log.error("Read failed", extra={"fields": {"sensor": sensor_id, "error": e}})
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+
+LOG_FILE = "backend_debug.log"
+LOG_LEVEL = logging.INFO
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+# Identical records inside this window are dropped and counted
+RATE_LIMIT_WINDOW = 60.0
+
+ROOT_LOGGER = "rack"
+
+class RepeatFilter(logging.Filter):
+    """Drops repeats of the same (logger, level, message, fields) within `window` seconds."""
+    MAX_KEYS = 512
+
+    def __init__(self, window: float = RATE_LIMIT_WINDOW):
+        super().__init__()
+        self.window = window
+        self._lock = threading.Lock()
+        self._seen = {} # key -> [last emitted at, suppressed count]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = getattr(record, "fields", None)
+        key = (record.name, record.levelno, record.getMessage(),
+               tuple(sorted((k, str(v)) for k, v in fields.items())) if fields else ())
+        now = record.created
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+            if entry is not None and entry[1]:
+                record.fields = dict(fields or {}, repeats=entry[1])
+            if len(self._seen) >= self.MAX_KEYS:
+                self._seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+            self._seen[key] = [now, 0]
+        return True
+
+class StructuredFormatter(logging.Formatter):
+    """Appends the record's `fields` as key=value pairs."""
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={v!r}" if isinstance(v, str) and " " in v else f"{k}={v}"
+                                   for k, v in fields.items())
+        return line
+
+class LogPipeline:
+    """QueueHandler for callers, QueueListener thread for the console and rotating file."""
+    def __init__(self, path: str = LOG_FILE, max_bytes: int = LOG_MAX_BYTES, backups: int = LOG_BACKUPS,
+                 window: float = RATE_LIMIT_WINDOW, console: bool = True):
+        self.queue = queue.SimpleQueue()
+        self.handler = logging.handlers.QueueHandler(self.queue)
+        self.handler.addFilter(RepeatFilter(window))
+
+        # delay=True: the file is only created once something is logged
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, delay=True)
+        file_handler.setFormatter(StructuredFormatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+        handlers = [file_handler]
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(StructuredFormatter("[%(name)s] %(levelname)s %(message)s"))
+            handlers.append(console_handler)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers)
+        self.listener.start()
+
+    def attach(self, logger: logging.Logger, level: int = LOG_LEVEL):
+        logger.addHandler(self.handler)
+        logger.setLevel(level)
+        logger.propagate = False
+
+    def stop(self):
+        """Drain the queue and close the file."""
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger "rack.<name>", wired to the shared pipeline (started on first use)."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = LogPipeline()
+            _pipeline.attach(logging.getLogger(ROOT_LOGGER))
+            atexit.register(_pipeline.stop)
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
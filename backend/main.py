@@ -1,5 +1,6 @@
 import asyncio
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
@@ -10,9 +11,18 @@ from sensors import SensorManager
 from leds import LEDManager
 from weather import WeatherManager
 from system import SystemManager
+from history import HistoryStore
+from stream import StreamHub
+from cache import ResponseCache
+from metrics import REGISTRY, CONTENT_TYPE, MetricsMiddleware
+from logs import get_logger
+from jobs import JobQueue
+from fleet import FleetManager, VIEW_REFRESH
 from pydantic import BaseModel
+from typing import Dict, List, Union
 
 app = FastAPI()
+log = get_logger("api")
 
 # Enable CORS for development (allowing Vite frontend to talk to us)
 app.add_middleware(
@@ -22,11 +32,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Per-route request latency for /metrics
+app.add_middleware(MetricsMiddleware)
 
 # Initialize Modules
 sensors_mgr = SensorManager()
 leds_mgr = LEDManager()
 weather_mgr = WeatherManager()
+history_store = HistoryStore()
+stream_hub = StreamHub()
+# Aggregator mode: only polls anything when fleet.peers is configured
+fleet_mgr = FleetManager()
+
+# Sweep pipeline: each sensor sweep is pushed to these as soon as it completes
+sensors_mgr.subscribe(leds_mgr.update_from_sensors, changes_only=True, replay=True)
+sensors_mgr.subscribe(history_store.record)
+sensors_mgr.subscribe(stream_hub.publish, replay=True)
 
 class SettingsUpdate(BaseModel):
     ntp_server: str = None
@@ -40,27 +61,24 @@ class SettingsUpdate(BaseModel):
     latitude: float = None
     longitude: float = None
     location_name: str = None
+    fleet_peers: List[Union[str, Dict[str, str]]] = None # Replaces fleet.peers (URLs or {"url", "name"})
 
 @app.on_event("startup")
 async def startup_event():
+    # Sweeps are published from the sensor thread; SSE clients live on this loop
+    stream_hub.bind_loop(asyncio.get_running_loop())
     # Start background polling loop
     asyncio.create_task(run_background_tasks())
 
 async def run_background_tasks():
+    # Sensor readings reach LEDs/history/stream via the sweep bus; only weather is polled here
     while True:
         try:
-            # 1. Read Sensors
-            readings = sensors_mgr.get_temperatures()
-            
-            # 2. Update LEDs
-            leds_mgr.update_from_sensors(readings)
-            
-            # 3. Opportunistic Weather Update (internal cache handles interval)
-            # Run in thread to prevent blocking loop
-            await asyncio.to_thread(weather_mgr.get_weather)
+            # Opportunistic Weather Update: no-op unless due, never blocks the loop
+            weather_mgr.refresh_in_background()
             
             # Sleep
-            await asyncio.sleep(2)
+            await asyncio.sleep(5)
         except Exception as e:
             print(f"Background loop error: {e}")
             await asyncio.sleep(5)
@@ -68,9 +86,11 @@ async def run_background_tasks():
 @app.on_event("shutdown")
 def shutdown_event():
     leds_mgr.cleanup()
+    history_store.close()
+    fleet_mgr.close()
+    CONFIG.flush()
 
-@app.get("/api/status")
-def get_status():
+def _build_status():
     readings = sensors_mgr.get_temperatures()
     # Format current time
     now = datetime.now()
@@ -79,23 +99,37 @@ def get_status():
         "time": now.strftime("%H:%M"),
         "date": now.strftime("%A, %B %d"),
         "sensors": readings,
+        "unit": CONFIG.get("temp_unit"),
         "led_status": leds_mgr.current_colors if leds_mgr.mock_mode else "hardware_controlled"
     }
 
-@app.get("/api/weather")
-def get_weather():
-    w = weather_mgr.get_weather()
-    if not w:
-        return {"status": "unavailable"}
-    return w
+status_cache = ResponseCache(_build_status)
 
-@app.get("/api/ha")
-def get_ha_data():
+@app.get("/api/status")
+def get_status(request: Request):
+    # Rebuilt only on a new sweep, a new minute (time field) or new LED colors
+    key = (sensors_mgr.bus.generation, int(time.time() // 60), leds_mgr.colors_version, leds_mgr.mock_mode)
+    return status_cache.respond(request, key)
+
+@app.get("/api/stream")
+async def stream_status(request: Request):
     """
-    Simplified endpoint for Home Assistant.
-    Returns a dictionary keyed by Sensor ID for stable parsing.
-    Example: { "28-03...": { "temp": 72.1, "name": "Bay A" } }
+    Server-Sent Events push of sensor sweeps: a "snapshot" on connect, then
+    a "delta" (changed slots only) whenever a sweep changes something.
     """
+    return StreamingResponse(
+        stream_hub.events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/weather")
+def get_weather():
+    # Answer from cache right away; a due refresh runs behind it (stale-while-revalidate)
+    weather_mgr.refresh_in_background()
+    return weather_mgr.get_cached()
+
+def _build_ha_data():
     readings = sensors_mgr.get_temperatures()
     data = {}
     
@@ -107,110 +141,216 @@ def get_ha_data():
 
     # 2. Sensor Data
     for i, r in enumerate(readings):
-        # Fetch calculated LED color
+        # Fetch calculated LED color (per slot, independent of strip layout)
         color = (0, 0, 0)
-        if i < len(leds_mgr.current_colors):
-            color = leds_mgr.current_colors[i]
+        if i < len(leds_mgr.slot_colors):
+            color = leds_mgr.slot_colors[i]
 
         data[f"id_{r['id']}"] = {
             "temp": r["temp"],
             "name": r["name"],
             "status": r["status"],
+            "stale": r.get("stale", False),
             "led_rgb": color
         }
     return data
 
+ha_cache = ResponseCache(_build_ha_data)
+
+@app.get("/api/ha")
+def get_ha_data(request: Request):
+    """
+    Simplified endpoint for Home Assistant.
+    Returns a dictionary keyed by Sensor ID for stable parsing.
+    Example: { "28-03...": { "temp": 72.1, "name": "Bay A" } }
+    Served from a cache keyed on the sweep generation; supports If-None-Match.
+    """
+    key = (sensors_mgr.bus.generation, leds_mgr.colors_version, leds_mgr.led_brightness, leds_mgr.mock_mode)
+    return ha_cache.respond(request, key)
+
+@app.get("/api/history")
+def get_history(
+    sensor: str = None,
+    from_: int = Query(None, alias="from"),
+    to: int = None,
+    step: int = None,
+    points: int = None
+):
+    """
+    Stored readings as [ts, avg, min, max] per `step`-second bucket.
+    from/to are unix seconds (default: last hour). Omit sensor for all sensors.
+    Pass points instead of step to let the server size the buckets; long
+    ranges are served from 1m/15m/1h rollups instead of raw samples.
+    """
+    return history_store.query(sensor=sensor, start=from_, end=to, step=step, points=points)
+
+fleet_cache = ResponseCache(fleet_mgr.view)
+
+@app.get("/api/fleet")
+def get_fleet(request: Request):
+    """
+    Every configured peer node's sensors, merged, plus a room-wide summary
+    (see fleet.py). Rebuilt when a peer changes, and every VIEW_REFRESH seconds
+    so last_seen/latency of unchanged peers stay current; supports If-None-Match.
+    """
+    if not fleet_mgr.enabled:
+        raise HTTPException(status_code=404, detail="No fleet peers configured")
+    key = (fleet_mgr.generation, CONFIG.get("temp_unit"), int(time.time() // VIEW_REFRESH))
+    return fleet_cache.respond(request, key)
+
+@app.get("/api/fleet/history")
+def get_fleet_history(
+    peer: str = None,
+    sensor: str = None,
+    from_: int = Query(None, alias="from"),
+    to: int = None,
+    step: int = None,
+    points: int = None
+):
+    """Like /api/history, over samples collected from peers. Series are keyed "<peer>/<sensor id>"."""
+    if not fleet_mgr.enabled:
+        raise HTTPException(status_code=404, detail="No fleet peers configured")
+    return fleet_mgr.query_history(peer=peer, sensor=sensor, start=from_, end=to, step=step, points=points)
+
+@app.get("/api/diagnostics")
+def get_diagnostics():
+    """Poll loop timing (last sweep), LED frame counters, per-probe sampling tiers and read filter state."""
+    return {"sweep": sensors_mgr.get_sweep_stats(), "leds": leds_mgr.get_render_stats(),
+            "sampling": sensors_mgr.scheduler.stats(), "filter": sensors_mgr.filter.stats()}
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition: probe temps/read latency/errors, sweeps, LED frames, weather, requests."""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
 @app.get("/api/settings")
 def get_settings():
     return CONFIG.get_all()
 
+# Settings fields each manager depends on
+SENSOR_SETTINGS = {"threshold_warning", "threshold_critical", "sensor_id", "sensor_name", "mock_mode"}
+LED_SETTINGS = SENSOR_SETTINGS | {"led_brightness"}
+WEATHER_SETTINGS = {"location_auto", "latitude", "longitude", "location_name"}
+FLEET_SETTINGS = {"fleet_peers"}
+
+def _apply_settings(changes):
+    """Settings job (background thread): manager reloads and system commands."""
+    if changes.keys() & SENSOR_SETTINGS:
+        sensors_mgr.reload_config()
+    if changes.keys() & LED_SETTINGS:
+        leds_mgr.reload_config()
+    if changes.keys() & WEATHER_SETTINGS:
+        weather_mgr.reload_config()
+    if changes.keys() & FLEET_SETTINGS:
+        fleet_mgr.reload_config()
+
+    # Update NTP (sudo mv + systemctl restart) whenever a server is sent, even the
+    # current one: the config only records it, the system file may have drifted
+    msg = "Settings updated"
+    ntp_server = changes.get("ntp_server")
+    if ntp_server:
+        success, ntp_msg = SystemManager.set_ntp_server(ntp_server)
+        if not success:
+            raise RuntimeError(f"{msg}, but NTP was not applied: {ntp_msg}")
+        msg += f". {ntp_msg}"
+    return msg
+
+# Rapid successive updates are merged into one job
+settings_jobs = JobQueue(_apply_settings, name="settings-jobs")
+
 @app.post("/api/settings")
 def update_settings(settings: SettingsUpdate):
+    """
+    Updates config in memory (saved debounced) and queues the side effects
+    (reloads, NTP) as a job; poll /api/settings/jobs/{job} for the outcome.
+    A brightness-only update (HA slider) is applied directly to the strip.
+    """
+    changes = settings.model_dump(exclude_none=True)
+    if changes.keys() == {"led_brightness"}:
+        CONFIG.set("led_brightness", settings.led_brightness)
+        leds_mgr.set_brightness(settings.led_brightness)
+        return {"message": "Brightness updated", "job": None, "config": CONFIG.get_all()}
+
     try:
         current = CONFIG.get_all()
-        # Log payload
-        try:
-            with open("backend_debug.log", "a") as f:
-                f.write(f"SETTINGS REQUEST: {settings}\n")
-        except: pass
-
-        # Check structure update (migration fix if config.json was old)
-        if "global" not in current["temp_thresholds"]:
-             current["temp_thresholds"] = {
-                 "global": current["temp_thresholds"],
-                 "sensors": {}
-             }
-
-        # Update Thresholds
-        target_scope = "global"
-        if settings.sensor_id and settings.sensor_id != "global":
-            target_scope = "sensors"
+        log.info("Settings request", extra={"fields": changes})
+
+        with CONFIG.lock:
+            # Check structure update (migration fix if config.json was old)
+            if "global" not in current["temp_thresholds"]:
+                 current["temp_thresholds"] = {
+                     "global": current["temp_thresholds"],
+                     "sensors": {}
+                 }
+
+            # Update Thresholds
+            target_scope = "global"
+            if settings.sensor_id and settings.sensor_id != "global":
+                target_scope = "sensors"
             
-        if target_scope == "global":
-            if settings.threshold_warning is not None:
-                current["temp_thresholds"]["global"]["warning"] = settings.threshold_warning
-            if settings.threshold_critical is not None:
-                 current["temp_thresholds"]["global"]["critical"] = settings.threshold_critical
-        else:
-            # Per-sensor
-            sid = settings.sensor_id
-            if sid not in current["temp_thresholds"]["sensors"]:
-                # Copy global as baseline if creating new
-                 current["temp_thresholds"]["sensors"][sid] = \
-                     current["temp_thresholds"]["global"].copy()
+            if target_scope == "global":
+                if settings.threshold_warning is not None:
+                    current["temp_thresholds"]["global"]["warning"] = settings.threshold_warning
+                if settings.threshold_critical is not None:
+                     current["temp_thresholds"]["global"]["critical"] = settings.threshold_critical
+            else:
+                # Per-sensor
+                sid = settings.sensor_id
+                if sid not in current["temp_thresholds"]["sensors"]:
+                    # Copy global as baseline if creating new
+                     current["temp_thresholds"]["sensors"][sid] = \
+                         current["temp_thresholds"]["global"].copy()
             
-            if settings.threshold_warning is not None:
-                current["temp_thresholds"]["sensors"][sid]["warning"] = settings.threshold_warning
-            if settings.threshold_critical is not None:
-                 current["temp_thresholds"]["sensors"][sid]["critical"] = settings.threshold_critical
+                if settings.threshold_warning is not None:
+                    current["temp_thresholds"]["sensors"][sid]["warning"] = settings.threshold_warning
+                if settings.threshold_critical is not None:
+                     current["temp_thresholds"]["sensors"][sid]["critical"] = settings.threshold_critical
             
-            # Update Name
-            if settings.sensor_name is not None:
-                 if "sensor_names" not in current:
-                     current["sensor_names"] = {}
-                 current["sensor_names"][sid] = settings.sensor_name
-
-        # Update Location
-        if settings.location_auto is not None:
-            current["location"]["auto"] = settings.location_auto
+                # Update Name
+                if settings.sensor_name is not None:
+                     if "sensor_names" not in current:
+                         current["sensor_names"] = {}
+                     current["sensor_names"][sid] = settings.sensor_name
+
+            # Update Location
+            if settings.location_auto is not None:
+                current["location"]["auto"] = settings.location_auto
             
-        # Update Mock Mode
-        if settings.mock_mode is not None:
-            current["mock_mode"] = settings.mock_mode
+            # Update Mock Mode
+            if settings.mock_mode is not None:
+                current["mock_mode"] = settings.mock_mode
             
-        # Update LED Brightness
-        if settings.led_brightness is not None:
-            current["led_brightness"] = settings.led_brightness
+            # Update LED Brightness
+            if settings.led_brightness is not None:
+                current["led_brightness"] = settings.led_brightness
             
-        # Update Manual Location Fields
-        if settings.latitude is not None:
-            current["location"]["latitude"] = settings.latitude
-        if settings.longitude is not None:
-            current["location"]["longitude"] = settings.longitude
-        if settings.location_name is not None:
-            current["location"]["name"] = settings.location_name
+            # Update Manual Location Fields
+            if settings.latitude is not None:
+                current["location"]["latitude"] = settings.latitude
+            if settings.longitude is not None:
+                current["location"]["longitude"] = settings.longitude
+            if settings.location_name is not None:
+                current["location"]["name"] = settings.location_name
+
+            # Update Fleet Peers
+            if settings.fleet_peers is not None:
+                current.setdefault("fleet", {})["peers"] = settings.fleet_peers
             
         CONFIG.save()
         
     except Exception as e:
-        try:
-            with open("backend_debug.log", "a") as f:
-                f.write(f"SETTINGS ENDPOINT ERROR: {e}\n")
-        except: pass
+        log.error("Settings endpoint error", extra={"fields": {"error": e}})
         raise HTTPException(status_code=500, detail=str(e))
     
-    # Reload Managers
-    sensors_mgr.reload_config()
-    leds_mgr.reload_config()
-    weather_mgr.reload_config()
-    
-    # Update NTP
-    msg = "Settings updated"
-    if settings.ntp_server:
-        success, ntp_msg = SystemManager.set_ntp_server(settings.ntp_server)
-        msg += f". {ntp_msg}"
-        
-    return {"message": msg, "config": CONFIG.get_all()}
+    job = settings_jobs.submit(changes)
+    return {"message": "Settings queued", "job": job["id"], "config": CONFIG.get_all()}
+
+@app.get("/api/settings/jobs/{job_id}")
+def get_settings_job(job_id: str):
+    job = settings_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
 
 # Mount Frontend Static Files (Production Mode)
 # This serves the 'dist' folder generated by 'npm run build'
@@ -0,0 +1,225 @@
+"""
+Prometheus/OpenMetrics instrumentation, served as text on /metrics.
+
+Metrics and their label children are allocated once (per sensor / route the
+first time it is seen) and updated in place: a counter bump is an int add,
+a histogram observation is a bisect plus an int add, so the hot paths
+(sensor reads, sweeps, LED frames, requests) can stay instrumented on the Pi.
+"""
+import bisect
+import threading
+import time
+from typing import Dict, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket bounds (seconds)
+READ_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5)
+SWEEP_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0)
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+FETCH_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+class _GaugeValue(_CounterValue):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = value
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1) # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _Metric:
+    """A metric family; label children are created once and reused."""
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        if not labels:
+            self._unlabeled = self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Child for these label values (keep references on hot paths)."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def remove(self, *values):
+        with self._lock:
+            self._children.pop(values, None)
+
+    def render(self, out: list):
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} {self.kind}")
+        for values, child in list(self._children.items()):
+            self._render_child(out, values, child)
+
+    def _render_child(self, out, values, child):
+        out.append(f"{self.name}{_format_labels(self.label_names, values)} {child.value}")
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1.0):
+        self._unlabeled.value += amount
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeValue()
+
+    def set(self, value: float):
+        self._unlabeled.value = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=REQUEST_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labels)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._unlabeled.observe(value)
+
+    def _render_child(self, out, values, child):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+            out.append(f"{self.name}_bucket{_format_labels(self.label_names, values, le)} {cumulative}")
+        labels = _format_labels(self.label_names, values)
+        out.append(f"{self.name}_sum{labels} {child.sum}")
+        out.append(f"{self.name}_count{labels} {child.count}")
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        out = []
+        for metric in self._metrics:
+            metric.render(out)
+        return "\n".join(out) + "\n"
+
+REGISTRY = Registry()
+
+# --- Instruments ---------------------------------------------------------------
+
+SENSOR_TEMPERATURE = REGISTRY.register(Gauge(
+    "rack_sensor_temperature_celsius", "Last good reading per probe", ("sensor",)))
+SENSOR_READ_SECONDS = REGISTRY.register(Histogram(
+    "rack_sensor_read_seconds", "Time to read one probe", ("sensor",), READ_BUCKETS))
+SENSOR_READ_ERRORS = REGISTRY.register(Counter(
+    "rack_sensor_read_errors_total", "Failed or rejected probe reads by kind (crc, read, sentinel, range, spike)",
+    ("sensor", "kind")))
+SENSOR_READ_RETRIES = REGISTRY.register(Counter(
+    "rack_sensor_read_retries_total", "Probe reads retried within the sweep", ("sensor",)))
+SWEEP_SECONDS = REGISTRY.register(Histogram(
+    "rack_sweep_duration_seconds", "Duration of a full sensor sweep", buckets=SWEEP_BUCKETS))
+SWEEP_SENSORS = REGISTRY.register(Gauge(
+    "rack_sweep_sensors", "Probes read in the last sweep"))
+LED_FRAMES = REGISTRY.register(Counter(
+    "rack_led_frames_total", "LED frames by result (pushed, skipped)", ("result",)))
+WEATHER_FETCH_SECONDS = REGISTRY.register(Histogram(
+    "rack_weather_fetch_seconds", "Latency of upstream weather requests", buckets=FETCH_BUCKETS))
+WEATHER_FETCH_FAILURES = REGISTRY.register(Counter(
+    "rack_weather_fetch_failures_total", "Failed upstream weather requests"))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "rack_http_request_duration_seconds", "API request latency per route", ("method", "route", "status")))
+FLEET_FETCH_SECONDS = REGISTRY.register(Histogram(
+    "rack_fleet_fetch_seconds", "Latency of peer status polls", ("peer",), READ_BUCKETS))
+FLEET_FETCH_FAILURES = REGISTRY.register(Counter(
+    "rack_fleet_fetch_failures_total", "Failed peer status polls", ("peer",)))
+FLEET_PEERS_ONLINE = REGISTRY.register(Gauge(
+    "rack_fleet_peers_online", "Peers that answered their last poll"))
+
+def read_error_kind(error: Exception) -> str:
+    return "crc" if "CRC" in str(error) else "read"
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing each HTTP request, labelled by route template
+    (not the raw path, so label cardinality stays bounded). Streaming
+    responses (SSE) are timed until the response headers are sent.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        t0 = time.perf_counter()
+        status = [500]
+        observed = [False]
+
+        def observe():
+            if not observed[0]:
+                observed[0] = True
+                path = getattr(scope.get("route"), "path", None) or "other" # Static files, 404s
+                HTTP_REQUEST_SECONDS.labels(scope["method"], path, str(status[0])).observe(time.perf_counter() - t0)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-type" and value.startswith(b"text/event-stream"):
+                        observe()
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                await send(message)
+                observe()
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            observe()
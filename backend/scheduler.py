@@ -0,0 +1,160 @@
+"""
+Per-probe adaptive sampling.
+
+Each probe sits in one of three tiers, re-evaluated after every reading:
+  fast   - within near_margin of its warning threshold, or changing faster
+           than fast_rate: short interval, fast_resolution
+  slow   - well below warning and stable for stable_samples readings:
+           long interval, slow_resolution (9/10-bit converts in 94/188ms)
+  normal - everything else, and probes not read yet
+Failed reads back off exponentially from fast_interval to normal_interval.
+The rate is a least-squares slope over the last RATE_WINDOW seconds; a
+fitted change within the +-1 LSB flicker band (at the coarsest resolution
+in the window) counts as flat, so quantization noise alone doesn't make a
+probe fast.
+Margins and rates are in degrees Celsius (per minute for rates).
+"""
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List
+
+FAST, NORMAL, SLOW = "fast", "normal", "slow"
+
+DEFAULT_SAMPLING = {
+    "adaptive": True,
+    "fast_interval": 1.0,
+    "normal_interval": 5.0,
+    "slow_interval": 15.0,
+    "fast_resolution": 11,
+    "normal_resolution": 12,
+    "slow_resolution": 10,
+    "near_margin": 3.0,
+    "fast_rate": 0.5,
+    "stable_rate": 0.1,
+    "stable_samples": 3,
+}
+
+# Shortest and longest poll-loop sleep between scheduler ticks
+MIN_TICK = 0.25
+MAX_TICK = 5.0
+
+# Samples used for the rate estimate
+RATE_WINDOW = 60.0
+MAX_RATE_SAMPLES = 64
+
+# DS18B20 step at 12-bit; each bit less doubles it
+LSB_12BIT_C = 0.0625
+
+def lsb(bits: int) -> float:
+    return LSB_12BIT_C * 2 ** (12 - bits)
+
+def fitted_rate(samples) -> float:
+    """
+    Least-squares slope of (time, temp, lsb) samples in C/min. 0 if the
+    fitted change over the window stays within the +-1 LSB flicker band
+    of the coarsest sample.
+    """
+    n = len(samples)
+    if n < 2:
+        return 0.0
+    t0 = samples[0][0]
+    mean_t = sum(s[0] - t0 for s in samples) / n
+    mean_v = sum(s[1] for s in samples) / n
+    var = sum((s[0] - t0 - mean_t) ** 2 for s in samples)
+    if var <= 0:
+        return 0.0
+    slope = sum((s[0] - t0 - mean_t) * (s[1] - mean_v) for s in samples) / var # C/s
+    span = samples[-1][0] - t0
+    if abs(slope * span) <= 2 * max(s[2] for s in samples):
+        return 0.0
+    return slope * 60
+
+class ProbeSchedule:
+    __slots__ = ("tier", "next_due", "samples", "rate", "stable_count", "failures")
+
+    def __init__(self):
+        self.tier = NORMAL
+        self.next_due = 0.0 # Due now
+        self.samples = deque(maxlen=MAX_RATE_SAMPLES) # (time, temp, lsb) within RATE_WINDOW
+        self.rate = 0.0 # C/min, fitted over samples
+        self.stable_count = 0
+        self.failures = 0 # Consecutive failed reads
+
+class SamplingScheduler:
+    def __init__(self, settings: Dict[str, Any] = None):
+        self._probes: Dict[str, ProbeSchedule] = {}
+        self.configure(settings)
+
+    def configure(self, settings: Dict[str, Any] = None):
+        merged = dict(DEFAULT_SAMPLING)
+        merged.update(settings or {})
+        self.enabled = bool(merged["adaptive"])
+        self.intervals = {FAST: float(merged["fast_interval"]), NORMAL: float(merged["normal_interval"]),
+                          SLOW: float(merged["slow_interval"])}
+        self.resolutions = {t: max(9, min(12, int(merged[f"{t}_resolution"]))) for t in (FAST, NORMAL, SLOW)}
+        self.near_margin = float(merged["near_margin"])
+        self.fast_rate = float(merged["fast_rate"])
+        self.stable_rate = float(merged["stable_rate"])
+        self.stable_samples = int(merged["stable_samples"])
+
+    def _get(self, sensor_id: str) -> ProbeSchedule:
+        probe = self._probes.get(sensor_id)
+        if probe is None:
+            probe = self._probes[sensor_id] = ProbeSchedule()
+        return probe
+
+    def due(self, sensor_ids: Iterable[str], now: float = None) -> List[str]:
+        now = time.time() if now is None else now
+        return [sid for sid in sensor_ids if self._get(sid).next_due <= now]
+
+    def resolution(self, sensor_id: str) -> int:
+        return self.resolutions[self._get(sensor_id).tier]
+
+    def record(self, sensor_id: str, temp_c: float, warning_c: float, now: float = None):
+        """Account a good reading and pick the probe's tier / next due time."""
+        now = time.time() if now is None else now
+        probe = self._get(sensor_id)
+        samples = probe.samples
+        if samples and now <= samples[-1][0]:
+            samples.pop() # Same instant (tests/tools): keep the newer value
+        # The reading was taken at the resolution of the tier it was due in
+        samples.append((now, temp_c, lsb(self.resolutions[probe.tier])))
+        while now - samples[0][0] > RATE_WINDOW:
+            samples.popleft()
+        probe.rate = fitted_rate(samples)
+        probe.failures = 0
+
+        changing = abs(probe.rate)
+        probe.stable_count = probe.stable_count + 1 if changing <= self.stable_rate else 0
+        if temp_c >= warning_c - self.near_margin or changing >= self.fast_rate:
+            probe.tier = FAST
+        elif temp_c < warning_c - 2 * self.near_margin and probe.stable_count >= self.stable_samples:
+            probe.tier = SLOW
+        else:
+            probe.tier = NORMAL
+        probe.next_due = now + self.intervals[probe.tier]
+
+    def record_error(self, sensor_id: str, now: float = None):
+        """Retry a failed probe after fast_interval, doubling per consecutive failure up to normal_interval."""
+        now = time.time() if now is None else now
+        probe = self._get(sensor_id)
+        probe.failures += 1
+        backoff = self.intervals[FAST] * 2 ** min(probe.failures - 1, 16)
+        probe.next_due = now + min(backoff, self.intervals[NORMAL])
+
+    def forget(self, keep: Iterable[str]):
+        keep = set(keep)
+        for sensor_id in [s for s in self._probes if s not in keep]:
+            del self._probes[sensor_id]
+
+    def next_delay(self, now: float = None) -> float:
+        """Seconds until the next probe is due, clamped to [MIN_TICK, MAX_TICK]."""
+        now = time.time() if now is None else now
+        if not self._probes:
+            return MAX_TICK
+        soonest = min(p.next_due for p in self._probes.values())
+        return max(MIN_TICK, min(MAX_TICK, soonest - now))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {sid: {"tier": p.tier, "resolution": self.resolutions[p.tier], "rate": round(p.rate, 3),
+                      "next_due": p.next_due} for sid, p in self._probes.items()}
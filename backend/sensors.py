@@ -2,8 +2,16 @@ import random
 import time
 import os
 import glob
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from config import CONFIG
+from bus import ReadingBus
+from logs import get_logger
+from hotplug import DeviceWatcher
+from scheduler import SamplingScheduler
+from filters import ReadingFilter
+from metrics import (SENSOR_TEMPERATURE, SENSOR_READ_SECONDS, SENSOR_READ_ERRORS, SENSOR_READ_RETRIES,
+                     SWEEP_SECONDS, SWEEP_SENSORS, read_error_kind)
 
 # Try to import w1thermsensor, fail gracefully if not on Pi/installed
 try:
@@ -14,53 +22,260 @@ except Exception:
     HAS_W1 = False
     W1SensorType = type(None) # Dummy for isinstance checks
 
+log = get_logger("sensors")
+
+W1_DEVICES_DIR = "/sys/bus/w1/devices"
+
+# Threads are spawned lazily, so this is only an upper bound for very large racks
+MAX_READ_WORKERS = 64
+
+# Max time to wait for a bus-wide conversion (12-bit is 750ms, plus margin)
+BULK_CONVERSION_TIMEOUT = 1.0
+
+# DS18B20 conversion time per resolution (bits -> seconds)
+CONVERSION_TIMES = {9: 0.094, 10: 0.188, 11: 0.375, 12: 0.75}
+
+# Failed/implausible reads of a probe that was good until now are retried
+# (each retry is a fresh per-device conversion) at most READ_RETRIES times,
+# and only while the retry still fits within READ_DEADLINE of the start of
+# the read stage
+READ_RETRIES = 2
+READ_DEADLINE = 1.5
+
+# w1_slave is two ~40 byte lines; temperature is one short number
+READ_BUFFER_SIZE = 128
+
+def parse_w1_slave(buf, n: int) -> int:
+    """
+    Millidegrees from the first n bytes of a w1_slave read, without slicing:
+      72 01 4b 46 7f ff 0e 10 57 : crc=57 YES
+      72 01 4b 46 7f ff 0e 10 57 t=23125
+    """
+    if n <= 0:
+        raise Exception("Empty file")
+    eol = buf.find(b"\n", 0, n)
+    if eol < 0:
+        eol = n
+    if buf.find(b"YES", 0, eol) < 0:
+        raise Exception("CRC check failed")
+    pos = buf.find(b"t=", eol, n)
+    if pos < 0:
+        raise Exception("Temp not found")
+    return parse_millis(buf, pos + 2, n)
+
+def parse_millis(buf, pos: int, end: int) -> int:
+    """Signed decimal integer starting at buf[pos], up to the first non-digit."""
+    sign = 1
+    if pos < end and buf[pos] == 45: # "-"
+        sign, pos = -1, pos + 1
+    value = 0
+    start = pos
+    while pos < end:
+        digit = buf[pos] - 48
+        if not 0 <= digit <= 9:
+            break
+        value = value * 10 + digit
+        pos += 1
+    if pos == start:
+        raise Exception("Temp not found")
+    return sign * value
+
 # Native fallback class
 class NativeW1Sensor:
-    def __init__(self, sensor_id):
+    """
+    Reads the w1_therm sysfs files through descriptors kept open across
+    reads: each pread at offset 0 makes sysfs regenerate the attribute
+    (a new conversion for w1_slave), straight into a preallocated buffer.
+    """
+    def __init__(self, sensor_id, device_name=None, devices_dir=None):
+        # device_name is the sysfs folder (e.g. "28-0000..."). It differs from
+        # sensor_id when wrapping a w1thermsensor device, whose id has no prefix.
         self.id = sensor_id
+        self.devices_dir = devices_dir or W1_DEVICES_DIR
+        self.device_dir = os.path.join(self.devices_dir, device_name or sensor_id)
         # Standard path
-        self.path = f"/sys/bus/w1/devices/{sensor_id}/w1_slave"
+        self.path = os.path.join(self.device_dir, "w1_slave")
+        # Newer kernels: plain millidegree value, no conversion if bulk-triggered
+        self.temperature_path = os.path.join(self.device_dir, "temperature")
+        self.bulk_master = self._find_bulk_master()
+        self.resolution = None # Bits, once set by set_resolution()
+        self._buf = bytearray(READ_BUFFER_SIZE)
+        self._bufs = [self._buf] # preadv() argument, allocated once
+        self._fds = {} # path -> descriptor, opened on first read
 
-    def get_temperature(self):
+    def _pread(self, path) -> int:
+        """Read path from offset 0 into self._buf; returns the byte count."""
+        fd = self._fds.get(path)
+        if fd is None:
+            fd = self._fds[path] = os.open(path, os.O_RDONLY)
         try:
-            with open(self.path, "r") as f:
-                lines = f.readlines()
-            
-            if not lines:
+            return _preadv(fd, self._bufs, 0)
+        except OSError:
+            # Unplugged devices fail with ENODEV: reopen next time (or fail to)
+            self._close_fd(path)
+            raise
+
+    def _close_fd(self, path):
+        fd = self._fds.pop(path, None)
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def close(self):
+        for path in list(self._fds):
+            self._close_fd(path)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass # Interpreter shutdown
+
+    def set_resolution(self, bits: int):
+        """
+        Conversion resolution (9-12 bit) via the w1_therm sysfs attribute.
+        Only the scratchpad is written (no EEPROM wear); resets on power loss.
+        """
+        with open(os.path.join(self.device_dir, "resolution"), "w") as f:
+            f.write(f"{int(bits)}\n")
+        self.resolution = int(bits)
+
+    def _find_bulk_master(self):
+        """Return the therm_bulk_read path of this sensor's bus master, if the kernel has one."""
+        try:
+            master = bus_master_of(self.device_dir)
+            bulk_path = os.path.join(self.devices_dir, master, "therm_bulk_read")
+            if os.path.exists(bulk_path) and os.path.exists(self.temperature_path):
+                return bulk_path
+        except Exception:
+            pass
+        return None
+
+    def read_converted(self):
+        """Collect the result of a bus-wide conversion (see trigger_bulk_conversion)."""
+        try:
+            n = self._pread(self.temperature_path)
+            if n <= 0:
                 raise Exception("Empty file")
-                
-            # Line 1 check YES
-            if "YES" not in lines[0]:
-                raise Exception("CRC check failed")
-                
-            # Line 2 get t=
-            pos = lines[1].find("t=")
-            if pos != -1:
-                temp_string = lines[1][pos+2:]
-                val = float(temp_string) / 1000.0
-                # Log occasional success to prove we are reading
-                # (Comment out if too spammy, but vital for debug now)
-                # with open("backend_debug.log", "a") as logf:
-                #     logf.write(f"NATIVE READ {self.id}: {val}\n")
-                return val
-            else:
-                raise Exception("Temp not found")
+            return parse_millis(self._buf, 0, n) / 1000.0
+        except Exception as e:
+            raise Exception(f"Native Bulk Read Error: {e}")
+
+    def get_temperature(self):
+        try:
+            return parse_w1_slave(self._buf, self._pread(self.path)) / 1000.0
         except Exception as e:
             raise Exception(f"Native Read Error: {e}")
 
+def _preadv(fd, buffers, offset) -> int:
+    return os.preadv(fd, buffers, offset)
+
+if not hasattr(os, "preadv"): # Platforms without preadv(2): one extra bytes object per read
+    def _preadv(fd, buffers, offset) -> int:
+        data = os.pread(fd, len(buffers[0]), offset)
+        buffers[0][:len(data)] = data
+        return len(data)
+
+def trigger_bulk_conversion(bulk_paths, timeout=BULK_CONVERSION_TIMEOUT):
+    """
+    Start a simultaneous conversion on every DS18B20 of each bus master, then
+    wait until none of them reports a conversion in progress.
+    therm_bulk_read reads back -1 while converting, 1 when results are ready.
+    Returns the list of masters that were triggered successfully.
+    """
+    triggered = []
+    for bulk_path in bulk_paths:
+        try:
+            with open(bulk_path, "w") as f:
+                f.write("trigger\n")
+            triggered.append(bulk_path)
+        except Exception as e:
+            print(f"[Sensors] Bulk trigger failed on {bulk_path}: {e}")
+
+    deadline = time.time() + timeout
+    pending = list(triggered)
+    while pending and time.time() < deadline:
+        still_converting = []
+        for bulk_path in pending:
+            try:
+                with open(bulk_path, "r") as f:
+                    if f.read().strip() == "-1":
+                        still_converting.append(bulk_path)
+            except Exception:
+                pass
+        pending = still_converting
+        if pending:
+            time.sleep(0.05)
+    return triggered
+
+def _from_fahrenheit(temp_f: float) -> float:
+    return (temp_f - 32) * 5 / 9
+
+def bus_master_of(device_dir):
+    """Name of the w1 bus master a device hangs off (e.g. "w1_bus_master2")."""
+    try:
+        return os.path.basename(os.path.dirname(os.path.realpath(device_dir)))
+    except Exception:
+        return ""
+
+def assign_slots(order, sensors, slot_count):
+    """
+    Map discovered sensors onto display slots in O(N).
+    Locked ids (sensor_order) keep their slot or show as "missing"; free
+    slots take the remaining sensors in discovery order; the rest are "empty".
+    """
+    available = {s.id: s for s in sensors}
+    slots = [None] * slot_count
+
+    for i, locked_id in enumerate(order[:slot_count]):
+        sensor = available.pop(locked_id, None)
+        slots[i] = sensor if sensor is not None else "missing"
+
+    remaining = iter(available.values())
+    for i in range(slot_count):
+        if slots[i] is None:
+            slots[i] = next(remaining, "empty")
+    return slots
+
 import threading
 
 class SensorManager:
-    def __init__(self):
+    def __init__(self, autostart: bool = True, devices_dir: str = None, sensor_factory=None):
+        # devices_dir / sensor_factory let simulators (see simulators.py) stand in for sysfs
+        self.devices_dir = devices_dir or W1_DEVICES_DIR
+        self.sensor_factory = sensor_factory or NativeW1Sensor
         self.mock_mode = CONFIG.get("mock_mode")
+        # Precompiled names/thresholds/unit, replaced wholesale on reload_config()
+        self._config_snapshot = CONFIG.snapshot()
         self.sensors = []
-        self._last_readings = [0.0] * 5
         self._cached_readings = []
         self._cache_lock = threading.Lock()
         self.running = True
+        # therm_bulk_read paths of bus masters supporting simultaneous conversion
+        self._bulk_masters = []
+
+        # Concurrent read engine: every probe converts in parallel so one
+        # sweep costs ~one conversion time (750ms @ 12-bit) instead of N of them.
+        self._read_pool = ThreadPoolExecutor(max_workers=MAX_READ_WORKERS, thread_name_prefix="w1-read")
+        self._sweep_stats = {"duration": 0.0, "read_duration": 0.0, "sensors": 0, "read": 0, "timestamp": 0.0}
+        # Every completed sweep is published here (LEDs, history, stream, ...)
+        self.bus = ReadingBus()
+        # Per-probe sample rate / resolution (see scheduler.py)
+        self.scheduler = SamplingScheduler(CONFIG.get("sampling"))
+        # Sentinel/spike rejection and last-good hold (see filters.py)
+        self.filter = ReadingFilter()
+        self._slot_cache = None # See _slots()
+        self._slot_readings = {} # Slot index -> last published reading dict
+        self._resolution_unsupported = set()
+        # Sensor id -> (read latency, temperature) metric children, bound once per probe
+        self._probe_metrics = {}
+        # Hot-plug events decide when to rediscover probes (kernel uevents only apply to the real sysfs)
+        self.watcher = DeviceWatcher(uevents=self.devices_dir == W1_DEVICES_DIR)
         
         # Check if we are physically capable of 1-wire
-        sys_w1 = glob.glob("/sys/bus/w1/devices/28-*")
+        sys_w1 = glob.glob(os.path.join(self.devices_dir, "28-*"))
         
         if not HAS_W1 and not sys_w1 and not self.mock_mode:
             print("w1thermsensor not found AND no OS devices found. Forcing Mock Mode")
@@ -69,11 +284,14 @@ class SensorManager:
         if not self.mock_mode:
             self._init_real_sensors()
 
-        # Start Poll Loop
+        # Start Poll Loop (benchmarks/tools drive sweep() themselves)
         self.poll_thread = threading.Thread(target=self._poll_loop, daemon=True)
-        self.poll_thread.start()
+        if autostart:
+            self.poll_thread.start()
 
     def reload_config(self):
+        self._config_snapshot = CONFIG.snapshot()
+        self.scheduler.configure(CONFIG.get("sampling"))
         new_mock = CONFIG.get("mock_mode")
         if self.mock_mode and not new_mock:
             print("Switching to Real Sensors...")
@@ -84,38 +302,196 @@ class SensorManager:
         print(f"[Sensors] Initializing Real Sensors...")
         try:
             found_sensors = []
-            try:
-                found_sensors = W1ThermSensor.get_available_sensors()
-            except Exception as e:
-                print(f"[Sensors] Library scan failed: {e}. Trying manual fallback.")
+            if self.devices_dir == W1_DEVICES_DIR:
+                try:
+                    found_sensors = W1ThermSensor.get_available_sensors()
+                except Exception as e:
+                    print(f"[Sensors] Library scan failed: {e}. Trying manual fallback.")
             
             if not found_sensors:
-                manual_paths = glob.glob("/sys/bus/w1/devices/28-*")
+                manual_paths = glob.glob(os.path.join(self.devices_dir, "28-*"))
                 if manual_paths:
                     print(f"[Sensors] Manual scan found {len(manual_paths)} sensors: {manual_paths}")
                     for path in manual_paths:
                         try:
                             sensor_id = os.path.basename(path)
-                            found_sensors.append(NativeW1Sensor(sensor_id))
+                            found_sensors.append(self.sensor_factory(sensor_id, devices_dir=self.devices_dir))
                         except Exception as e2:
                             print(f"[Sensors] Failed to load manual sensor {path}: {e2}")
                 else:
-                    print(f"[Sensors] Manual scan found NO sensors in /sys/bus/w1/devices/28-*")
+                    print(f"[Sensors] Manual scan found NO sensors in {self.devices_dir}/28-*")
 
-            self.sensors = found_sensors[:5]
+            # Stable order across several bus masters: group by master, then id
+            found_sensors.sort(key=lambda s: (bus_master_of(os.path.dirname(self._device_file(s))), s.id))
+            self.sensors = self._setup_bulk_mode(found_sensors)
+            for sensor in self.sensors:
+                self._metrics(sensor.id)
             print(f"[Sensors] Init complete. Found: {len(self.sensors)}")
-            if len(self.sensors) < 5:
-                print(f"Warning: Only found {len(self.sensors)} sensors.")
+            slot_count = self._config_snapshot.slots
+            if len(self.sensors) < slot_count:
+                print(f"Warning: Only found {len(self.sensors)} sensors for {slot_count} slots.")
         except Exception as e:
             print(f"Error initializing 1-wire sensors: {e}. Switching to Mock Mode.")
             self.mock_mode = True
 
-    def _log_error(self, msg):
-        print(f"[Sensors ERROR] {msg}")
+    def _rescan(self):
+        """Rediscover probes, reporting what was plugged in or removed."""
+        self.watcher.begin_scan()
+        previous = {s.id: s for s in self.sensors}
+        self._init_real_sensors()
+        # Probes still present keep their object (open descriptors, resolution)
+        self.sensors = [previous[s.id] if type(previous.get(s.id)) is type(s) else s for s in self.sensors]
+        kept = {id(s) for s in self.sensors}
+        for old in previous.values():
+            if id(old) not in kept and hasattr(old, "close"):
+                old.close()
+        before, after = set(previous), {s.id for s in self.sensors}
+        self.scheduler.forget(after)
+        self.filter.forget(after)
+        for sensor_id in before - after:
+            # A dead probe stops exporting its last temperature
+            self._probe_metrics.pop(sensor_id, None)
+            SENSOR_TEMPERATURE.remove(sensor_id)
+        if after != before:
+            log.info("Probes changed", extra={"fields": {"added": sorted(after - before), "removed": sorted(before - after)}})
+
+    @staticmethod
+    def _device_file(sensor) -> str:
+        # NativeW1Sensor.path / W1ThermSensor.sensorpath both point at w1_slave
+        return str(getattr(sensor, "path", None) or getattr(sensor, "sensorpath", ""))
+
+    def _setup_bulk_mode(self, found_sensors):
+        """
+        If the kernel exposes therm_bulk_read, swap library sensors for native
+        ones (same id) so a sweep can be "bulk trigger, then collect".
+        Otherwise keep per-device w1_slave reads.
+        """
+        bulk_sensors = []
+        for s in found_sensors:
+            if isinstance(s, NativeW1Sensor):
+                bulk_sensors.append(s)
+                continue
+            native = NativeW1Sensor(s.id, device_name=os.path.basename(os.path.dirname(self._device_file(s))))
+            bulk_sensors.append(native if native.bulk_master else s)
+
+        self._bulk_masters = sorted({s.bulk_master for s in bulk_sensors
+                                     if isinstance(s, NativeW1Sensor) and s.bulk_master})
+        if self._bulk_masters:
+            print(f"[Sensors] Bulk conversion available on: {self._bulk_masters}")
+            return bulk_sensors
+        return found_sensors
+
+    def _slots(self, order, slot_count):
+        """(assign_slots() result, probes in it), recomputed only when the order, probe list or slot count changes."""
+        cached = self._slot_cache
+        if cached and cached[0] == order and cached[1] is self.sensors and cached[2] == slot_count:
+            return cached[3], cached[4]
+        slots = assign_slots(order, self.sensors, slot_count)
+        probes = [item for item in slots if hasattr(item, "get_temperature")]
+        self._slot_cache = (list(order), self.sensors, slot_count, slots, probes)
+        return slots, probes
+
+    def _slot_reading(self, i, sensor_id, name, temp, status, stale=None):
+        """
+        The slot's previous reading dict when nothing changed, else a new one.
+        Steady sweeps then allocate no dicts, and the bus compares them by identity.
+        Published dicts are never mutated.
+        """
+        prev = self._slot_readings.get(i)
+        if (prev is not None and prev["id"] == sensor_id and prev["temp"] == temp and prev["status"] == status
+                and prev["name"] == name and prev.get("stale") == stale):
+            return prev
+        reading = {"id": sensor_id, "name": name, "temp": temp, "status": status}
+        if stale is not None:
+            reading["stale"] = stale
+        self._slot_readings[i] = reading
+        return reading
+
+    def _metrics(self, sensor_id):
+        """(read latency, temperature) metric children of a probe, looked up in the registry only once."""
+        children = self._probe_metrics.get(sensor_id)
+        if children is None:
+            children = self._probe_metrics[sensor_id] = (SENSOR_READ_SECONDS.labels(sensor_id),
+                                                         SENSOR_TEMPERATURE.labels(sensor_id))
+        return children
+
+    def _log_error(self, msg, **fields):
+        log.error(msg, extra={"fields": fields})
+
+    def _read_all(self, probes) -> Dict[str, Any]:
+        """
+        Read every probe concurrently. Returns {sensor_id: temp or Exception}.
+        Reads that raise or return a sentinel are retried together in a
+        second wave while that still fits the read deadline, but only for
+        probes whose previous read was good: a probe already in a failure
+        streak gets its next attempt from the scheduler's backoff instead.
+        """
+        deadline = time.time() + READ_DEADLINE
+        # Bulk mode: one conversion per bus that has a probe to read, then collect results
+        triggered = set()
+        if self._bulk_masters:
+            wanted = {getattr(p, "bulk_master", None) for p in probes}
+            triggered = set(trigger_bulk_conversion([m for m in self._bulk_masters if m in wanted]))
+
+        results = {}
+        wave = [(p, p.read_converted if triggered and getattr(p, "bulk_master", None) in triggered
+                 else p.get_temperature) for p in probes]
+        for attempt in range(READ_RETRIES + 1):
+            futures = [(p, self._read_pool.submit(self._timed_read, read, self._metrics(p.id)[0]))
+                       for p, read in wave]
+            retry = []
+            for p, future in futures:
+                try:
+                    results[p.id] = temp = future.result()
+                    if self.filter.implausible(p.id, temp) is None:
+                        continue
+                except Exception as e:
+                    results[p.id] = e
+                if self.filter.healthy(p.id) and os.path.exists(getattr(p, "device_dir", None) or self._device_file(p)):
+                    retry.append(p) # Not worth retrying an unplugged probe
+            # A retry is a fresh conversion at the probe's resolution
+            cost = max((CONVERSION_TIMES.get(getattr(p, "resolution", None) or 12, 0.75) for p in retry), default=0)
+            if not retry or attempt == READ_RETRIES or time.time() + cost > deadline:
+                break
+            for p in retry:
+                SENSOR_READ_RETRIES.labels(p.id).inc()
+            wave = [(p, p.get_temperature) for p in retry]
+
+        for sensor_id, result in results.items():
+            if isinstance(result, Exception):
+                SENSOR_READ_ERRORS.labels(sensor_id, read_error_kind(result)).inc()
+        return results
+
+    @staticmethod
+    def _timed_read(read, latency):
+        t0 = time.perf_counter()
         try:
-            with open("backend_debug.log", "a") as f:
-                f.write(f"{time.ctime()}: {msg}\n")
-        except: pass
+            return read()
+        finally:
+            latency.observe(time.perf_counter() - t0)
+
+    def _apply_resolutions(self, probes):
+        """Switch probes to their tier's resolution (only writes when it changes)."""
+        for p in probes:
+            bits = self.scheduler.resolution(p.id)
+            if getattr(p, "resolution", None) == bits or p.id in self._resolution_unsupported:
+                continue
+            try:
+                p.set_resolution(bits) # w1thermsensor sensors have the same method
+                p.resolution = bits
+            except Exception as e:
+                # Old kernel (no resolution attribute) or not root: stay at the default
+                self._resolution_unsupported.add(p.id)
+                log.info("Resolution not adjustable", extra={"fields": {"sensor": p.id, "error": e}})
+
+    def subscribe(self, callback, changes_only: bool = False, replay: bool = False):
+        """Register callback(readings, timestamp), run on the poll thread after each sweep."""
+        self.bus.subscribe(callback, changes_only=changes_only, replay=replay)
+
+    def get_sweep_stats(self) -> Dict[str, Any]:
+        """Timing of the last completed sweep (seconds), for checking poll cost."""
+        with self._cache_lock:
+            return dict(self._sweep_stats)
 
     def get_temperatures(self) -> List[Dict[str, Any]]:
         with self._cache_lock:
@@ -125,132 +501,152 @@ class SensorManager:
     def _poll_loop(self):
         print("[Sensors] Poll Thread Started")
         while self.running:
-            readings = []
             t_start = time.time()
+            if self.scheduler.enabled and not self.mock_mode:
+                # Adaptive: each tick reads only the probes that are due
+                self.sweep(scheduled=True)
+                time.sleep(self.scheduler.next_delay())
+                continue
 
-            if self.mock_mode:
-                # Mock Logic
-                bases = [22.0, 24.5, 28.0, 19.5, 31.0]
-                for i in range(5):
-                    variation = math.sin(t_start * 0.1 + i) * 0.5 + random.uniform(-0.1, 0.1)
-                    temp = bases[i] + variation
-                    if CONFIG.get("temp_unit") == "F":
-                        temp = (temp * 9/5) + 32
-                    
-                    sensor_id = f"mock-{i+1}"
-                    readings.append({
-                        "id": sensor_id,
-                        "name": CONFIG.get("sensor_names", {}).get(sensor_id, f"Probe {i+1}"),
-                        "temp": round(temp, 1),
-                        "status": self._get_status(round(temp, 1), sensor_id)
-                    })
-            else:
-                # Real Logic
-                try:
-                    # 1. Hardware Scan (Only every 30s to save IO, or if empty)
-                    # For stability, let's keep the list static unless we specifically rescan
-                    # But if we have 0 sensors, we should keep looking.
-                    if not self.sensors:
-                         self._init_real_sensors()
-
-                    # 2. Prepare Slots
-                    order = CONFIG.get("sensor_order") or []
-                    available_map = {s.id: s for s in self.sensors}
-                    final_slots = [None] * 5
-
-                    for i, locked_id in enumerate(order):
-                        if i >= 5: break
-                        if locked_id in available_map:
-                            final_slots[i] = available_map.pop(locked_id)
-                        else:
-                            final_slots[i] = "missing"
-
-                    remaining_sensors = list(available_map.values())
-                    for i in range(5):
-                        if final_slots[i] is None:
-                            if remaining_sensors:
-                                final_slots[i] = remaining_sensors.pop(0)
-                            else:
-                                final_slots[i] = "empty"
-
-                    # 3. Read Data
-                    new_order = []
-                    
-                    for i, item in enumerate(final_slots):
-                        if isinstance(item, (W1ThermSensor, NativeW1Sensor)):
-                            try:
-                                temp = item.get_temperature()
-                                if CONFIG.get("temp_unit") == "F":
-                                    temp = (temp * 9/5) + 32
-                                temp = round(temp, 1)
-                                status = self._get_status(temp, item.id)
-                                
-                                readings.append({
-                                    "id": item.id,
-                                    "name": CONFIG.get("sensor_names", {}).get(item.id, f"Probe {i+1}"),
-                                    "temp": temp,
-                                    "status": status
-                                })
-                                new_order.append(item.id)
-                            except Exception as e:
-                                self._log_error(f"Sensor Read Error ({item.id}): {e}")
-                                readings.append({
-                                    "id": item.id,
-                                    "name": CONFIG.get("sensor_names", {}).get(item.id, f"Probe {i+1}"),
-                                    "temp": 0.0,
-                                    "status": "error"
-                                })
-                                new_order.append(item.id)
-
-                        elif item == "missing":
-                             miss_id = order[i]
-                             readings.append({
-                                "id": miss_id,
-                                "name": CONFIG.get("sensor_names", {}).get(miss_id, f"Probe {i+1}"),
-                                "temp": 0.0,
-                                "status": "searching"
-                            })
-                             new_order.append(miss_id)
-                        else:
-                             # FALLBACK / ERROR
-                             readings.append({
-                                "id": f"empty-{i}",
-                                "name": "Empty Slot",
-                                "temp": 0.0,
-                                "status": "empty"
-                            })
-
-                    # 4. Auto-save Config Logic (Simplified)
-                    # Only if we found significantly more unique real sensors
-                    current_config = CONFIG.get("sensor_order") or []
-                    real_sensors_found = [x for x in new_order if not x.startswith("empty-")]
-                    if len(real_sensors_found) > len(current_config):
-                         CONFIG.set("sensor_order", real_sensors_found)
-                         print(f"Auto-Locked new sensor order: {real_sensors_found}")
-
-                except Exception as e:
-                    self._log_error(f"Poll Loop Error: {e}")
-                    # Provide fallback or keep old readings?
-                    # For now, just continue, preserving old cache if loop fails
-                    pass
-
-            # Update Cache
-            if readings:
-                with self._cache_lock:
-                     self._cached_readings = readings
+            self.sweep()
 
             # Sleep Remainder
             elapsed = time.time() - t_start
             sleep_time = max(1.0, 5.0 - elapsed) # Min 1s sleep, target 5s interval
             time.sleep(sleep_time)
 
-    def _get_status(self, temp: float, sensor_id: str = None) -> str:
-        thresholds = CONFIG.get_thresholds(sensor_id) if sensor_id else CONFIG.get("temp_thresholds")["global"]
-        if temp >= thresholds["critical"]:
-            return "critical"
-        elif temp >= thresholds["warning"]:
-            return "warning"
+    def sweep(self, scheduled: bool = False) -> List[Dict[str, Any]]:
+        """
+        Read every slot once, update the cache and sweep stats. Returns the readings.
+        With scheduled=True only probes the scheduler says are due are read;
+        the others report their last good value.
+        """
+        readings = []
+        probes = []
+        to_read = []
+        read_duration = 0.0
+        t_start = time.time()
+        snap = self._config_snapshot
+        slot_count = snap.slots
+
+        if self.mock_mode:
+            # Mock Logic
+            bases = [22.0, 24.5, 28.0, 19.5, 31.0]
+            for i in range(slot_count):
+                variation = math.sin(t_start * 0.1 + i) * 0.5 + random.uniform(-0.1, 0.1)
+                temp = round(snap.convert(bases[i % len(bases)] + variation), 1)
+                
+                sensor_id = f"mock-{i+1}"
+                profile = snap.profile(sensor_id)
+                readings.append({
+                    "id": sensor_id,
+                    "name": profile.name or f"Probe {i+1}",
+                    "temp": temp,
+                    "status": profile.status(temp)
+                })
         else:
-            return "normal"
+            # Real Logic
+            try:
+                # 1. Hardware Scan: only after a hot-plug event, a vanished probe,
+                # or the watcher's low-frequency fallback timer
+                if self.watcher.rescan_due():
+                    self._rescan()
+
+                # 2. Prepare Slots
+                order = CONFIG.get("sensor_order") or []
+                final_slots, probes = self._slots(order, slot_count)
+
+                # 3. Read Data (all probes at once)
+                new_order = []
+                to_read = probes
+                if scheduled and self.scheduler.enabled:
+                    due = set(self.scheduler.due([p.id for p in probes], t_start))
+                    to_read = [p for p in probes if p.id in due]
+                if self.scheduler.enabled:
+                    self._apply_resolutions(to_read)
+                t_read = time.time()
+                results = self._read_all(to_read)
+                read_duration = time.time() - t_read
+                to_celsius = _from_fahrenheit if snap.unit == "F" else float
+
+                for i, item in enumerate(final_slots):
+                    if hasattr(item, "get_temperature"):
+                        profile = snap.profile(item.id)
+                        unplugged = False
+                        if item.id in results: # Otherwise not due this tick
+                            raw = results[item.id]
+                            if isinstance(raw, Exception):
+                                self._log_error("Sensor Read Error", sensor=item.id, error=raw)
+                                self.filter.fail(item.id, t_start)
+                                if not os.path.exists(getattr(item, "device_dir", None) or self._device_file(item)):
+                                    unplugged = True
+                                    self.watcher.notify() # Unplugged: drop it on the next sweep
+                                rejected = True
+                            else:
+                                rejected = self.filter.check(item.id, raw, t_start)
+                                if rejected:
+                                    SENSOR_READ_ERRORS.labels(item.id, rejected).inc()
+                                    self._log_error("Sensor Reading Rejected", sensor=item.id, temp=raw, reason=rejected)
+                                else:
+                                    self._metrics(item.id)[1].set(raw)
+                            if rejected:
+                                self.scheduler.record_error(item.id, t_start)
+                            else:
+                                self.scheduler.record(item.id, raw, to_celsius(profile.warning), t_start)
+
+                        # Failed reads keep showing the last good value (stale) until the hold expires
+                        good, stale, expired = self.filter.held(item.id, t_start)
+                        temp = round(snap.convert(good), 1) if good is not None else 0.0
+                        status = "error" if good is None or expired or unplugged else profile.status(temp)
+                        readings.append(self._slot_reading(i, item.id, profile.name or f"Probe {i+1}",
+                                                           temp, status, stale))
+                        new_order.append(item.id)
+
+                    elif item == "missing":
+                         miss_id = order[i]
+                         readings.append(self._slot_reading(i, miss_id, snap.profile(miss_id).name or f"Probe {i+1}",
+                                                            0.0, "searching"))
+                         new_order.append(miss_id)
+                    else:
+                         # FALLBACK / ERROR
+                         readings.append(self._slot_reading(i, f"empty-{i}", "Empty Slot", 0.0, "empty"))
+
+                # 4. Auto-save Config Logic (Simplified)
+                # Only if we found significantly more unique real sensors
+                current_config = CONFIG.get("sensor_order") or []
+                real_sensors_found = [x for x in new_order if not x.startswith("empty-")]
+                if len(real_sensors_found) > len(current_config):
+                     CONFIG.set("sensor_order", real_sensors_found)
+                     print(f"Auto-Locked new sensor order: {real_sensors_found}")
+
+            except Exception as e:
+                self._log_error("Poll Loop Error", error=e)
+                # Provide fallback or keep old readings?
+                # For now, just continue, preserving old cache if loop fails
+                pass
+
+        # Update Cache
+        elapsed = time.time() - t_start
+        SWEEP_SECONDS.observe(elapsed)
+        SWEEP_SENSORS.set(len(to_read))
+        with self._cache_lock:
+            if readings:
+                self._cached_readings = readings
+            self._sweep_stats = {
+                "duration": round(elapsed, 4),
+                "read_duration": round(read_duration, 4),
+                "sensors": len(probes),
+                "read": len(to_read),
+                "timestamp": t_start,
+            }
+
+        if readings:
+            self.bus.publish(readings, t_start)
+        return readings
+
+    def _get_status(self, temp: float, sensor_id: str = None) -> str:
+        snap = self._config_snapshot
+        profile = snap.profile(sensor_id) if sensor_id else snap.default
+        return profile.status(temp)
 
 import math # Ensure math is available
@@ -0,0 +1,210 @@
+"""
+Hardware-free stand-ins for the 1-Wire bus and the NeoPixel strip.
+
+FakeW1Tree builds a sysfs-shaped directory (w1_bus_masterN/28-xxxx with
+w1_slave, temperature and therm_bulk_read, plus the devices/ symlinks) so
+SensorManager runs its real discovery, parsing and bulk-read code against it.
+SimulatedW1Sensor adds conversion latency, CRC failures and power-on
+sentinels; FakeNeoPixel records every frame pushed with show().
+
+    tree = FakeW1Tree(sensors=40, masters=2, conversion_time=0.75)
+    mgr = SensorManager(autostart=False, devices_dir=tree.devices_dir,
+                        sensor_factory=tree.sensor_factory)
+    leds = LEDManager(pixels=FakeNeoPixel(8))
+"""
+import math
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sensors import CONVERSION_TIMES, NativeW1Sensor
+
+class FakeW1Tree:
+    """A fake /sys/bus/w1 tree with N probes spread over M bus masters."""
+    def __init__(self, sensors: int = 5, masters: int = 1, conversion_time: float = 0.0,
+                 crc_fail_rate: float = 0.0, sentinel_rate: float = 0.0,
+                 bulk: bool = True, seed: int = 1, root: Optional[str] = None):
+        self.root = root or tempfile.mkdtemp(prefix="fake-w1-")
+        self.devices_dir = os.path.join(self.root, "devices")
+        self.conversion_time = conversion_time
+        self.crc_fail_rate = crc_fail_rate
+        self.sentinel_rate = sentinel_rate # Chance of reading the 85.000 power-on value
+        self.bulk = bulk
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.temperatures: Dict[str, float] = {} # Celsius, per device
+        self.device_master: Dict[str, str] = {}
+        self.read_count = 0
+        # Called after a probe is added/removed, like kernel uevents (e.g. [mgr.watcher.notify])
+        self.listeners = []
+
+        os.makedirs(self.devices_dir, exist_ok=True)
+        self.masters = []
+        for m in range(1, masters + 1):
+            self.add_master(f"w1_bus_master{m}")
+        for i in range(sensors):
+            self.add_sensor(master=self.masters[i % len(self.masters)])
+
+    # --- Topology -------------------------------------------------------
+
+    def add_master(self, name: str):
+        path = os.path.join(self.root, "bus", name)
+        os.makedirs(path, exist_ok=True)
+        if self.bulk:
+            with open(os.path.join(path, "therm_bulk_read"), "w") as f:
+                f.write("0\n")
+        link = os.path.join(self.devices_dir, name)
+        if not os.path.islink(link):
+            os.symlink(path, link)
+        self.masters.append(name)
+
+    def add_sensor(self, sensor_id: Optional[str] = None, master: Optional[str] = None,
+                   temp_c: Optional[float] = None) -> str:
+        """Hot-plug a probe. Returns its device id."""
+        with self._lock:
+            sensor_id = sensor_id or f"28-{len(self.temperatures) + 1:012x}"
+            master = master or self.masters[0]
+            path = os.path.join(self.root, "bus", master, sensor_id)
+            os.makedirs(path, exist_ok=True)
+            self.temperatures[sensor_id] = temp_c if temp_c is not None else 20.0 + self.rng.uniform(0, 10)
+            self.device_master[sensor_id] = master
+            self._write_files(sensor_id, ok=True, milli=int(self.temperatures[sensor_id] * 1000))
+            os.symlink(path, os.path.join(self.devices_dir, sensor_id))
+        self._notify()
+        return sensor_id
+
+    def remove_sensor(self, sensor_id: str):
+        """Unplug a probe (its sysfs entries disappear, like the kernel does)."""
+        with self._lock:
+            master = self.device_master.pop(sensor_id)
+            self.temperatures.pop(sensor_id, None)
+            os.unlink(os.path.join(self.devices_dir, sensor_id))
+            shutil.rmtree(os.path.join(self.root, "bus", master, sensor_id), ignore_errors=True)
+        self._notify()
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener()
+
+    def set_temperature(self, sensor_id: str, temp_c: float):
+        self.temperatures[sensor_id] = temp_c
+
+    def sensor_ids(self) -> List[str]:
+        return sorted(self.temperatures)
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    # --- Conversions ----------------------------------------------------
+
+    def _write_files(self, sensor_id: str, ok: bool, milli: int):
+        path = os.path.join(self.root, "bus", self.device_master[sensor_id], sensor_id)
+        raw = milli * 16 // 1000 & 0xFFFF
+        scratch = f"{raw & 0xFF:02x} {raw >> 8:02x} 4b 46 7f ff 0c 10 1c"
+        crc = "YES" if ok else "NO"
+        with open(os.path.join(path, "w1_slave"), "w") as f:
+            f.write(f"{scratch} : crc=1c {crc}\n{scratch} t={milli}\n")
+        with open(os.path.join(path, "temperature"), "w") as f:
+            f.write(f"{milli}\n")
+
+    def convert(self, sensor_id: str):
+        """Produce a fresh sample for one probe (noise, CRC failures, sentinels)."""
+        with self._lock:
+            if sensor_id not in self.temperatures:
+                raise FileNotFoundError(sensor_id)
+            self.read_count += 1
+            temp = self.temperatures[sensor_id] + 0.2 * math.sin(time.time() / 30) + self.rng.uniform(-0.05, 0.05)
+            milli = int(round(temp * 1000))
+            if self.rng.random() < self.sentinel_rate:
+                milli = 85000
+            ok = self.rng.random() >= self.crc_fail_rate
+            self._write_files(sensor_id, ok, milli)
+
+    def sensor_factory(self, sensor_id, device_name=None, devices_dir=None):
+        """Drop-in for NativeW1Sensor as SensorManager(sensor_factory=...)."""
+        return SimulatedW1Sensor(self, sensor_id, device_name=device_name, devices_dir=devices_dir or self.devices_dir)
+
+class SimulatedW1Sensor(NativeW1Sensor):
+    """NativeW1Sensor whose reads block like a real conversion, then parse the fake sysfs files."""
+    def __init__(self, tree: FakeW1Tree, sensor_id, device_name=None, devices_dir=None):
+        self.tree = tree
+        super().__init__(sensor_id, device_name=device_name, devices_dir=devices_dir)
+
+    def get_temperature(self):
+        # Per-device read: the driver starts a conversion and blocks for it
+        if self.tree.conversion_time:
+            time.sleep(self.conversion_time())
+        try:
+            self.tree.convert(os.path.basename(self.device_dir))
+        except FileNotFoundError:
+            # Unplugged: sysfs fails reads on the open descriptors (ENODEV), while
+            # a removed regular file would keep serving its old contents
+            self.close()
+        return super().get_temperature()
+
+    def conversion_time(self):
+        """tree.conversion_time is the 12-bit time; lower resolutions convert proportionally faster."""
+        bits = self.resolution or 12
+        return self.tree.conversion_time * CONVERSION_TIMES[bits] / CONVERSION_TIMES[12]
+
+    def read_converted(self):
+        # Bulk read: the conversion started when therm_bulk_read was written
+        if self.tree.conversion_time and self.bulk_master:
+            try:
+                started = os.stat(self.bulk_master).st_mtime
+                remaining = started + self.tree.conversion_time - time.time()
+                if remaining > 0:
+                    time.sleep(remaining)
+            except OSError:
+                pass
+        try:
+            self.tree.convert(os.path.basename(self.device_dir))
+        except FileNotFoundError:
+            self.close()
+        return super().read_converted()
+
+class FakeNeoPixel:
+    """
+    NeoPixel-compatible sink that records frames instead of driving GPIO.
+    transfer_time_per_led simulates the WS2812 wire time (~30us per LED).
+    """
+    def __init__(self, n: int, brightness: float = 1.0, transfer_time_per_led: float = 0.0,
+                 max_frames: int = 10000):
+        self.n = n
+        self.brightness = brightness
+        self.transfer_time_per_led = transfer_time_per_led
+        self.max_frames = max_frames
+        self._buf = [(0, 0, 0)] * n
+        self.frames = [] # (monotonic time, tuple of colors)
+        self.show_count = 0
+        self.pixel_writes = 0
+        self.show_time = 0.0
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        return self._buf[i]
+
+    def __setitem__(self, i, color):
+        self._buf[i] = tuple(color)
+        self.pixel_writes += 1
+
+    def fill(self, color):
+        self._buf = [tuple(color)] * self.n
+
+    def show(self):
+        t0 = time.perf_counter()
+        if self.transfer_time_per_led:
+            time.sleep(self.transfer_time_per_led * self.n)
+        self.show_count += 1
+        if len(self.frames) < self.max_frames:
+            self.frames.append((time.monotonic(), tuple(self._buf)))
+        self.show_time += time.perf_counter() - t0
+
+    def deinit(self):
+        pass
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+# Idle connections get a comment line this often so proxies keep them open
+KEEPALIVE_INTERVAL = 30
+# Messages buffered per client before it is considered stuck and resynced
+CLIENT_QUEUE_SIZE = 16
+
+def _sse(event: str, generation: int, payload: Dict[str, Any]) -> bytes:
+    return f"event: {event}\nid: {generation}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n".encode()
+
+class StreamHub:
+    """
+    Server-Sent Events fan-out for /api/stream.
+    publish() runs once per sensor sweep (poll thread): it diffs the sweep
+    against the previous one and serializes a single delta message that is
+    handed to every connected client. Nothing runs between sweeps.
+
+    Events:
+      snapshot  {"generation", "time", "date", "sensors": [...]}          (on connect)
+      delta     {"generation", "time", "date", "count", "sensors": {slot: reading}}
+    """
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._snapshot = {"generation": 0, "time": "", "date": "", "sensors": []}
+        self._snapshot_message = _sse("snapshot", 0, self._snapshot)
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """Event loop the client queues live on (set at app startup)."""
+        self._loop = loop
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def publish(self, readings: List[Dict[str, Any]], timestamp: float):
+        now = datetime.fromtimestamp(timestamp)
+        time_str = now.strftime("%H:%M")
+        date_str = now.strftime("%A, %B %d")
+
+        with self._lock:
+            prev = self._snapshot
+            prev_sensors = prev["sensors"]
+            changed = {str(i): r for i, r in enumerate(readings)
+                       if i >= len(prev_sensors) or prev_sensors[i] != r}
+            if not changed and len(readings) == len(prev_sensors) and time_str == prev["time"]:
+                return
+
+            self._generation += 1
+            gen = self._generation
+            self._snapshot = {"generation": gen, "time": time_str, "date": date_str, "sensors": list(readings)}
+            self._snapshot_message = _sse("snapshot", gen, self._snapshot)
+            message = _sse("delta", gen, {
+                "generation": gen,
+                "time": time_str,
+                "date": date_str,
+                "count": len(readings),
+                "sensors": changed
+            })
+
+        if self._loop and self._clients:
+            self._loop.call_soon_threadsafe(self._fanout, message)
+
+    def _fanout(self, message: bytes):
+        # Runs on the event loop
+        for queue in list(self._clients):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog and resync with a full snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._snapshot_message)
+
+    async def events(self, request):
+        """Async generator of SSE bytes for one client."""
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._clients.add(queue)
+        try:
+            with self._lock:
+                first = self._snapshot_message
+            yield first
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    message = b": keepalive\n\n"
+                yield message
+        finally:
+            self._clients.discard(queue)
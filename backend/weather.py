@@ -1,20 +1,77 @@
+import bisect
+import json
+import os
 import requests
+import threading
 import time
 from config import CONFIG
 from system import SystemManager
 from typing import Dict, Any
+from metrics import WEATHER_FETCH_SECONDS, WEATHER_FETCH_FAILURES
+from logs import get_logger
+from singleflight import SingleFlight
+
+log = get_logger("weather")
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+IP_API_URL = "http://ip-api.com/json/"
+
+# One batched request: current conditions + hourly forecast (unix timestamps)
+WEATHER_FIELDS = "temperature_2m,relative_humidity_2m,weather_code"
+FORECAST_HOURS = 48
+FORECAST_PREVIEW_HOURS = 12 # Hourly points included in API responses
+
+# Last-known-good weather per location, so a restart shows the last reading instead of "Offline"
+WEATHER_CACHE_FILE = "weather_cache.json"
+CACHE_MAX_LOCATIONS = 4
+
+OFFLINE_WEATHER = {"temp": "--", "code": 0, "unit": "F", "location_name": "Offline"}
 
 def log_debug(msg):
-    # Print to stdout so it shows in logs/console immediately
-    print(f"[WEATHER] {msg}")
-    try:
-        with open("backend_debug.log", "a") as f:
-            f.write(f"[WEATHER] {time.ctime()}: {msg}\n")
-    except: pass
+    # Console + backend_debug.log, written off the caller's thread
+    log.info(msg)
+
+def cache_key(lat, lon) -> str:
+    """Locations ~1km apart share a cache entry."""
+    return f"{round(float(lat), 2)},{round(float(lon), 2)}"
+
+def interpolate_hourly(hourly: Dict[str, list], now: float):
+    """
+    Values at `now` from an Open-Meteo hourly block: temperature and humidity
+    linearly interpolated between the surrounding hours, weather code from
+    the hour in progress. None if `now` is outside the forecast.
+    """
+    times = hourly.get("time") or []
+    i = bisect.bisect_right(times, now) - 1
+    if i < 0 or i + 1 >= len(times):
+        return None
+    frac = (now - times[i]) / (times[i + 1] - times[i])
+    out = {"weather_code": hourly.get("weather_code", [None] * len(times))[i]}
+    for field in ("temperature_2m", "relative_humidity_2m"):
+        values = hourly.get(field)
+        if values and values[i] is not None and values[i + 1] is not None:
+            out[field] = values[i] + (values[i + 1] - values[i]) * frac
+    return out
 
 class WeatherManager:
-    def __init__(self):
+    """
+    Open-Meteo weather for the configured/auto-detected location.
+    get_weather() refreshes synchronously when the cache is due; request
+    handlers use get_cached() + refresh_in_background() instead, so they
+    always answer from memory while at most one refresh runs behind them
+    (stale-while-revalidate). Both share one pooled HTTP session, and
+    concurrent refreshes/location lookups are coalesced into one upstream call.
+    """
+    def __init__(self, cache_path: str = WEATHER_CACHE_FILE):
+        self.session = requests.Session() # Keep-alive connections to Open-Meteo / ip-api
+        self.cache_path = cache_path
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._flight = SingleFlight()
         self.current_weather = None
+        self._hourly = {} # Open-Meteo hourly block of the current location
+        self._anchor = None # interpolate_hourly() at fetch time
+        self._cache = {} # cache_key(lat, lon) -> {fetched_at, location_name, current, hourly}
         self.last_update = 0
         self.update_interval = 1800 # 30 minutes
         
@@ -29,6 +86,110 @@ class WeatherManager:
         self._is_using_auto_fallback = False
         self._last_location_check = 0
         self._location_check_interval = 3600 # Re-check every hour if auto
+        self._load_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                cached = json.load(f)
+            self._cache = {k: v for k, v in cached.items() if isinstance(v, dict) and "current" in v}
+            if self._cache:
+                # Until the location is known, show the most recently fetched one
+                self._use_entry(max(self._cache.values(), key=lambda e: e["fetched_at"]))
+                log_debug(f"Loaded cached weather for {self.current_weather.get('location_name')}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log_debug(f"Ignoring unreadable weather cache: {e}")
+
+    def _save_cache(self):
+        # Compact: only the most recent few locations, no whitespace
+        newest = sorted(self._cache.items(), key=lambda kv: kv[1]["fetched_at"], reverse=True)
+        self._cache = dict(newest[:CACHE_MAX_LOCATIONS])
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._cache, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            log_debug(f"Weather cache save failed: {e}")
+
+    def _use_entry(self, entry: Dict[str, Any]):
+        """Make a fetched (or cached) forecast the one being served."""
+        current = entry["current"]
+        self._hourly = entry.get("hourly") or {}
+        self._cached_weather = {
+            "temp": current.get("temperature_2m", "--"),
+            "code": current.get("weather_code", 0),
+            "humidity": current.get("relative_humidity_2m"),
+            "unit": "F",
+            "location_name": entry.get("location_name", "Unknown")
+        }
+        self.current_weather = self._cached_weather
+        # The forecast at fetch time: the served values follow the forecast's change since then
+        self._anchor = interpolate_hourly(self._hourly, entry["fetched_at"]) if self._hourly else None
+        # Still fresh after a quick restart / location switch: no need to refetch
+        self.last_update = self._last_weather_time = entry["fetched_at"]
+
+    def _view(self, now: float = None) -> Dict[str, Any]:
+        """
+        Current weather as served to clients, plus the next hours of forecast.
+        Between refreshes temperature and humidity drift from the fetched
+        (observed) values by however much the hourly forecast changed since the
+        fetch, so they match `current` right after it. The code stays the fetched one.
+        """
+        weather = self.current_weather
+        if not weather:
+            return OFFLINE_WEATHER
+        now = time.time() if now is None else now
+        hourly = self._hourly
+        view = dict(weather)
+        interp = interpolate_hourly(hourly, now) if hourly and self._anchor else None
+        if interp:
+            for field, key in (("temperature_2m", "temp"), ("relative_humidity_2m", "humidity")):
+                if field in interp and field in self._anchor and isinstance(weather.get(key), (int, float)):
+                    view[key] = weather[key] + interp[field] - self._anchor[field]
+            if isinstance(view["temp"], float):
+                view["temp"] = round(view["temp"], 1)
+            if view.get("humidity") is not None:
+                view["humidity"] = min(100, max(0, round(view["humidity"])))
+        times = hourly.get("time") or []
+        start = bisect.bisect_right(times, now)
+        view["forecast"] = [
+            {"time": t, "temp": hourly["temperature_2m"][j], "code": hourly["weather_code"][j]}
+            for j, t in enumerate(times[start:start + FORECAST_PREVIEW_HOURS], start)
+        ] if "temperature_2m" in hourly and "weather_code" in hourly else []
+        view["stale"] = now - self._last_weather_time >= self.update_interval
+        return view
+
+    def get_cached(self) -> Dict[str, Any]:
+        """Never blocks: last good weather (marked stale once past its interval), else Offline."""
+        return self._view()
+
+    def refresh_due(self) -> bool:
+        if self._backoff_until > time.time():
+            return False
+        return not self.current_weather or time.time() - self.last_update >= self.update_interval
+
+    def refresh_in_background(self) -> bool:
+        """Start a refresh thread if one is due and none is running. Returns True if started."""
+        if not self.refresh_due():
+            return False
+        with self._refresh_lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, name="weather-refresh", daemon=True).start()
+        return True
+
+    def _background_refresh(self):
+        try:
+            self.get_weather()
+        except Exception as e:
+            log_debug(f"Background refresh failed: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
 
     def reload_config(self):
         """Reset cached location to force re-evaluation from CONFIG (auto or manual)"""
@@ -41,7 +202,14 @@ class WeatherManager:
     def get_weather(self) -> Dict[str, Any]:
         # Return cached if valid
         if time.time() - self.last_update < self.update_interval and self.current_weather:
-            return self.current_weather
+            return self._view()
+        # Everyone arriving during a refresh (poll loop, requests) shares its result
+        return self._flight.do("weather", self._refresh_weather)
+
+    def _refresh_weather(self) -> Dict[str, Any]:
+        # Someone else may have refreshed while we were queued
+        if time.time() - self.last_update < self.update_interval and self.current_weather:
+            return self._view()
         
         # Rate Limit / Retry Backoff
         # If we failed recently, don't retry immediately to avoid banning
@@ -51,7 +219,7 @@ class WeatherManager:
             backoff_time = 5
             
         if self._backoff_until > time.time():
-             return {"temp": "--", "code": 0, "unit": "F", "location_name": "Offline"}
+             return OFFLINE_WEATHER
 
         # Determine location
         loc = CONFIG.get("location")
@@ -84,31 +252,51 @@ class WeatherManager:
             self.location_name = config_name
             self._is_using_auto_fallback = True
 
+        # A recent fetch for this spot (e.g. switching back to it) is reused
+        key = cache_key(self.lat, self.lon)
+        entry = self._cache.get(key)
+        if entry and time.time() - entry["fetched_at"] < self.update_interval:
+            self._use_entry(dict(entry, location_name=self.location_name))
+            return self._view()
+
         # Fetch Weather
         try:
             # 2. Fetch Weather
-            url = f"https://api.open-meteo.com/v1/forecast?latitude={self.lat}&longitude={self.lon}&current=temperature_2m,weather_code&temperature_unit=fahrenheit&wind_speed_unit=mph&precipitation_unit=inch"
+            params = {
+                "latitude": self.lat,
+                "longitude": self.lon,
+                "current": WEATHER_FIELDS,
+                "hourly": WEATHER_FIELDS,
+                "forecast_hours": FORECAST_HOURS,
+                "timeformat": "unixtime",
+                "temperature_unit": "fahrenheit",
+                "wind_speed_unit": "mph",
+                "precipitation_unit": "inch",
+            }
             
+            t_fetch = time.perf_counter()
             try:
-                r = requests.get(url, timeout=10)
+                r = self.session.get(OPEN_METEO_URL, params=params, timeout=10)
                 r.raise_for_status() # Raise error for 4xx/5xx
                 data = r.json()
             except Exception as e:
+                WEATHER_FETCH_FAILURES.inc()
                 log_debug(f"API Request Failed: {e}")
                 raise e
+            finally:
+                WEATHER_FETCH_SECONDS.observe(time.perf_counter() - t_fetch)
 
-            current = data.get("current", {})
-            self._cached_weather = {
-                "temp": current.get("temperature_2m", "--"),
-                "code": current.get("weather_code", 0),
-                "unit": "F",
-                "location_name": self.location_name
+            entry = {
+                "fetched_at": time.time(),
+                "location_name": self.location_name,
+                "current": data.get("current", {}),
+                "hourly": data.get("hourly", {}),
             }
-            self.current_weather = self._cached_weather
-            self._last_weather_time = time.time()
-            self.last_update = time.time()
+            self._cache[key] = entry
+            self._use_entry(entry)
+            self._save_cache()
             log_debug(f"Weather updated for {self.location_name}: {self._cached_weather['temp']}F")
-            return self._cached_weather
+            return self._view()
 
         except Exception as e:
             print(f"Weather Error: {e}")
@@ -119,9 +307,13 @@ class WeatherManager:
             delay = 5 if not self.current_weather else 60
             self._backoff_until = time.time() + delay
             
-            return {"temp": "--", "code": 0, "unit": "F", "location_name": "Offline"}
+            return OFFLINE_WEATHER
 
     def _update_location_auto(self):
+        # One ip-api lookup at a time; concurrent callers wait for its outcome
+        return self._flight.do("location", self._detect_location)
+
+    def _detect_location(self):
         try:
             # Check config first - if auto is False, don't ping IP API
             loc = CONFIG.get("location")
@@ -129,7 +321,7 @@ class WeatherManager:
                 return # Skip auto
 
             # Use ip-api to get lat/lon based on public IP
-            r = requests.get("http://ip-api.com/json/", timeout=5)
+            r = self.session.get(IP_API_URL, timeout=5)
             data = r.json()
             if data.get("status") == "success":
                 self.lat = data.get("lat")
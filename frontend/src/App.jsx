@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import axios from 'axios'
 import Clock from './components/Clock'
 import SensorCard from './components/SensorCard'
@@ -13,31 +13,75 @@ function App() {
   const [contextMenu, setContextMenu] = useState(null) // {x, y}
 
   const [history, setHistory] = useState([])
+  const historyLoaded = useRef(false)
+
+  // Seed the graph from the backend history store (survives kiosk reloads)
+  const loadHistory = async (sensors) => {
+    try {
+      const now = Math.floor(Date.now() / 1000)
+      const res = await axios.get('/api/history', { params: { from: now - 3600, to: now, step: 10 } })
+      const series = res.data.series || {}
+      const ids = sensors.slice(0, 3).map(s => s.id)
+
+      const buckets = new Map()
+      ids.forEach((id, idx) => {
+        (series[id] || []).forEach(([ts, temp]) => {
+          if (!buckets.has(ts)) buckets.set(ts, {})
+          buckets.get(ts)[`s${idx + 1}`] = temp
+        })
+      })
+
+      const points = [...buckets.entries()]
+        .sort((a, b) => a[0] - b[0])
+        .filter(([, p]) => p.s1 !== undefined && p.s2 !== undefined && p.s3 !== undefined)
+        .map(([ts, p]) => ({
+          time: new Date(ts * 1000).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit', hour12: false }),
+          ...p,
+          avg: parseFloat(((p.s1 + p.s2 + p.s3) / 3).toFixed(1))
+        }))
+
+      setHistory(prev => [...points, ...prev].slice(-360))
+    } catch (e) {
+      console.error("History fetch error", e)
+    }
+  }
+
+  const lastPointAt = useRef(0)
+
+  const applyStatus = (newData) => {
+    setData(newData)
+
+    if (!historyLoaded.current && newData.sensors && newData.sensors.length >= 3) {
+      historyLoaded.current = true
+      loadHistory(newData.sensors)
+    }
+
+    // Update History for Graph (one point per 10s, regardless of push rate)
+    const nowMs = Date.now()
+    if (newData.sensors && newData.sensors.length >= 3 && nowMs - lastPointAt.current >= 10000) {
+      lastPointAt.current = nowMs
+      const s1 = newData.sensors[0].temp
+      const s2 = newData.sensors[1].temp
+      const s3 = newData.sensors[2].temp
+      const avg = (s1 + s2 + s3) / 3
+
+      setHistory(prev => {
+        const newPoint = {
+          time: newData.time.split(' ')[0], // Just HH:mm:ss if possible, or usually API returns formatted time
+          s1, s2, s3,
+          avg: parseFloat(avg.toFixed(1))
+        }
+        const newHist = [...prev, newPoint]
+        if (newHist.length > 360) newHist.shift() // Keep last 360 points (1 hour at 10s interval)
+        return newHist
+      })
+    }
+  }
 
   const fetchData = async () => {
     try {
       const res = await axios.get('/api/status')
-      const newData = res.data
-      setData(newData)
-
-      // Update History for Graph
-      if (newData.sensors && newData.sensors.length >= 3) {
-        const s1 = newData.sensors[0].temp
-        const s2 = newData.sensors[1].temp
-        const s3 = newData.sensors[2].temp
-        const avg = (s1 + s2 + s3) / 3
-
-        setHistory(prev => {
-          const newPoint = {
-            time: newData.time.split(' ')[0], // Just HH:mm:ss if possible, or usually API returns formatted time
-            s1, s2, s3,
-            avg: parseFloat(avg.toFixed(1))
-          }
-          const newHist = [...prev, newPoint]
-          if (newHist.length > 360) newHist.shift() // Keep last 360 points (1 hour at 10s interval)
-          return newHist
-        })
-      }
+      applyStatus(res.data)
     } catch (e) {
       console.error("Status fetch error", e)
     }
@@ -67,13 +111,44 @@ function App() {
       timeoutId = setTimeout(fetchWeatherLoop, nextDelay);
     }
 
+    // Live sensor updates: server push (SSE), falling back to 10s polling
+    let statusInterval = null
+    let source = null
+    const startPolling = () => {
+      if (statusInterval) return
+      fetchData()
+      statusInterval = setInterval(fetchData, 10000)
+    }
+
+    if (window.EventSource) {
+      let current = null
+      source = new EventSource('/api/stream')
+      source.addEventListener('snapshot', (e) => {
+        current = JSON.parse(e.data)
+        if (current.sensors.length) applyStatus(current)
+      })
+      source.addEventListener('delta', (e) => {
+        const delta = JSON.parse(e.data)
+        const sensors = (current?.sensors || []).slice(0, delta.count)
+        Object.entries(delta.sensors).forEach(([slot, reading]) => { sensors[slot] = reading })
+        current = { ...current, time: delta.time, date: delta.date, sensors }
+        applyStatus(current)
+      })
+      source.onerror = () => {
+        // EventSource retries by itself; only poll if it gave up for good
+        if (source.readyState === EventSource.CLOSED) startPolling()
+      }
+      fetchData() // Paint immediately, before the first push arrives
+    } else {
+      startPolling()
+    }
+
     // Start loops
-    fetchData()
     fetchWeatherLoop()
-    const statusInterval = setInterval(fetchData, 10000)
 
     return () => {
-      clearInterval(statusInterval)
+      if (statusInterval) clearInterval(statusInterval)
+      if (source) source.close()
       clearTimeout(timeoutId)
     }
   }, [])
@@ -21,7 +21,8 @@ function SensorCard({ sensor }) {
         <div className={`glass-panel h-full flex flex-col items-center justify-center p-2 transition-all duration-500 ${getBorderColor(sensor.status)}`}>
             <h3 className="text-gray-400 text-2xl font-semibold uppercase tracking-wider mb-2 text-center w-full px-1 truncate">{sensor.name}</h3>
 
-            <div className={`text-7xl font-bold flex items-start tabular-nums tracking-tighter justify-center ${getStatusColor(sensor.status)}`}>
+            <div className={`text-7xl font-bold flex items-start tabular-nums tracking-tighter justify-center ${getStatusColor(sensor.status)} ${sensor.stale ? 'opacity-50' : ''}`}
+                 title={sensor.stale ? 'Last good reading (probe not responding)' : undefined}>
                 {sensor.temp}
                 <span className="text-3xl mt-2 ml-1">°F</span>
             </div>
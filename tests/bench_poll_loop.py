@@ -0,0 +1,68 @@
+"""
+Poll loop cost vs. sensor count.
+
+Runs SensorManager.sweep() against N fake probes (no hardware needed) and
+prints the slot assignment cost and the full sweep cost for each N.
+Usage: python tests/bench_poll_loop.py [conversion_seconds]
+"""
+import sys
+import os
+import time
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from config import CONFIG
+from sensors import SensorManager, assign_slots
+
+SENSOR_COUNTS = [5, 10, 20, 40, 80]
+ROUNDS = 20
+
+
+class FakeProbe:
+    def __init__(self, sensor_id, conversion_time):
+        self.id = sensor_id
+        self.conversion_time = conversion_time
+
+    def get_temperature(self):
+        if self.conversion_time:
+            time.sleep(self.conversion_time)
+        return 24.5
+
+
+def bench(count, conversion_time):
+    probes = [FakeProbe(f"28-{i:012x}", conversion_time) for i in range(count)]
+    order = [p.id for p in probes]
+
+    # Never persist from a benchmark: keep config in memory only
+    CONFIG._config["mock_mode"] = False
+    CONFIG._config["sensor_slots"] = count
+    CONFIG._config["sensor_order"] = order
+    # Every probe read every sweep at a fixed resolution (FakeProbe can't change it)
+    CONFIG._config["sampling"] = {"adaptive": False}
+
+    mgr = SensorManager(autostart=False)
+    mgr.mock_mode = False
+    mgr.sensors = probes
+
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        assign_slots(order, probes, count)
+    assign_ms = (time.perf_counter() - t0) / ROUNDS * 1000
+
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        mgr.sweep()
+    sweep_ms = (time.perf_counter() - t0) / ROUNDS * 1000
+
+    mgr._read_pool.shutdown(wait=False)
+    return assign_ms, sweep_ms
+
+
+if __name__ == "__main__":
+    conversion_time = float(sys.argv[1]) if len(sys.argv) > 1 else 0.0
+    print(f"Conversion time per probe: {conversion_time * 1000:.0f} ms, {ROUNDS} rounds each")
+    print(f"{'sensors':>8} {'assign (ms)':>12} {'sweep (ms)':>12}")
+    for count in SENSOR_COUNTS:
+        assign_ms, sweep_ms = bench(count, conversion_time)
+        print(f"{count:>8} {assign_ms:>12.3f} {sweep_ms:>12.3f}")
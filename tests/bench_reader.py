@@ -0,0 +1,97 @@
+"""
+Per-read cost of the native w1 reader: the old text-mode reader vs
+NativeW1Sensor (persistent descriptor, pread into a preallocated buffer,
+byte-level parsing).
+
+Reads sysfs-shaped files from a temp dir, so it measures Python overhead
+only (no conversion time). Prints time per read and the peak memory a
+single read allocates on top of what is already live.
+Usage: python tests/bench_reader.py [reads]
+"""
+import sys
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from sensors import NativeW1Sensor
+
+READS = 20000
+W1_SLAVE = "72 01 4b 46 7f ff 0e 10 57 : crc=57 YES\n72 01 4b 46 7f ff 0e 10 57 t=23125\n"
+
+
+def legacy_get_temperature(path):
+    """NativeW1Sensor.get_temperature before the pread reader."""
+    with open(path, "r") as f:
+        lines = f.readlines()
+    if not lines:
+        raise Exception("Empty file")
+    if "YES" not in lines[0]:
+        raise Exception("CRC check failed")
+    pos = lines[1].find("t=")
+    if pos == -1:
+        raise Exception("Temp not found")
+    return float(lines[1][pos+2:]) / 1000.0
+
+
+def legacy_read_converted(path):
+    with open(path, "r") as f:
+        raw = f.read().strip()
+    if not raw:
+        raise Exception("Empty file")
+    return int(raw) / 1000.0
+
+
+def make_device(root):
+    device_dir = os.path.join(root, "28-000000000001")
+    os.makedirs(device_dir)
+    with open(os.path.join(device_dir, "w1_slave"), "w") as f:
+        f.write(W1_SLAVE)
+    with open(os.path.join(device_dir, "temperature"), "w") as f:
+        f.write("23125\n")
+    return NativeW1Sensor("28-000000000001", devices_dir=root)
+
+
+def per_read_us(read, reads):
+    read() # Warm up (opens the descriptor)
+    t0 = time.perf_counter()
+    for _ in range(reads):
+        read()
+    return (time.perf_counter() - t0) / reads * 1e6
+
+
+def peak_bytes(read):
+    """Memory allocated at the peak of one read, beyond what was live before it."""
+    read()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        read()
+        return tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else READS
+    root = tempfile.mkdtemp(prefix="w1-bench-")
+    try:
+        sensor = make_device(root)
+        cases = [
+            ("w1_slave", lambda: legacy_get_temperature(sensor.path), sensor.get_temperature),
+            ("temperature", lambda: legacy_read_converted(sensor.temperature_path), sensor.read_converted),
+        ]
+        print(f"{reads} reads each")
+        print(f"{'file':<12} {'reader':<7} {'us/read':>9} {'peak bytes/read':>16}")
+        for name, before, after in cases:
+            assert before() == after()
+            for label, read in (("before", before), ("after", after)):
+                print(f"{name:<12} {label:<7} {per_read_us(read, reads):>9.2f} {peak_bytes(read):>16}")
+        sensor.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
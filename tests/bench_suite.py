@@ -0,0 +1,198 @@
+"""
+Benchmark suite: sensor sweep, API latency/throughput, LED frames, config saves.
+
+Runs entirely off-hardware (simulated 1-Wire tree, in-process ASGI calls)
+and writes the results to JSON so releases can be compared.
+Usage: python tests/bench_suite.py [--output bench_results.json] [--quick]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.append(BACKEND)
+
+def _stats(samples):
+    """Summary of a list of durations in seconds, reported in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+# --- Sensor sweeps -----------------------------------------------------------
+
+def bench_sweeps(counts, rounds):
+    from unittest.mock import patch
+    from config import CONFIG
+    from sensors import SensorManager
+    from simulators import FakeW1Tree
+
+    results = {}
+    with patch.object(CONFIG, "save"):
+        for bulk in (True, False):
+            for count in counts:
+                tree = FakeW1Tree(sensors=count, masters=max(1, count // 20), bulk=bulk)
+                CONFIG._config.update({"mock_mode": False, "sensor_slots": count,
+                                       "sensor_order": tree.sensor_ids()})
+                mgr = SensorManager(autostart=False, devices_dir=tree.devices_dir,
+                                    sensor_factory=tree.sensor_factory)
+                mgr.sweep() # Warm up the read pool
+                samples = []
+                for _ in range(rounds):
+                    t0 = time.perf_counter()
+                    mgr.sweep()
+                    samples.append(time.perf_counter() - t0)
+                mgr._read_pool.shutdown(wait=False)
+                tree.cleanup()
+                results[f"{'bulk' if bulk else 'per_device'}_{count}"] = _stats(samples)
+    return results
+
+# --- API ---------------------------------------------------------------------
+
+async def _asgi_request(app, method, path, body=b"", headers=()):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench"), (b"content-type", b"application/json"), *headers],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    response = {}
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        await asyncio.sleep(3600) # Never disconnects mid-request
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = dict(message.get("headers", []))
+
+    await app(scope, receive, send)
+    return response
+
+async def _load(app, method, path, clients, per_client, body=b"", headers=()):
+    latencies = []
+    statuses = {}
+
+    async def client():
+        for _ in range(per_client):
+            t0 = time.perf_counter()
+            resp = await _asgi_request(app, method, path, body, headers)
+            latencies.append(time.perf_counter() - t0)
+            statuses[resp["status"]] = statuses.get(resp["status"], 0) + 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    wall = time.perf_counter() - t0
+    result = _stats(latencies)
+    result["throughput_rps"] = round(len(latencies) / wall, 1)
+    result["statuses"] = statuses
+    return result
+
+def bench_api(client_counts, per_client):
+    import main
+    app = main.app
+    main.sensors_mgr.sweep() # Make sure there is data to serve
+
+    async def run():
+        etag = (await _asgi_request(app, "GET", "/api/status"))["headers"].get(b"etag", b"")
+        routes = {
+            "status": ("GET", "/api/status", b"", ()),
+            "status_304": ("GET", "/api/status", b"", ((b"if-none-match", etag),)),
+            "ha": ("GET", "/api/ha", b"", ()),
+            "settings_get": ("GET", "/api/settings", b"", ()),
+            "settings_post_brightness": ("POST", "/api/settings", b'{"led_brightness": 128}', ()),
+        }
+        results = {}
+        for name, (method, path, body, headers) in routes.items():
+            for clients in client_counts:
+                results[f"{name}_c{clients}"] = await _load(app, method, path, clients, per_client, body, headers)
+        return results
+
+    return asyncio.run(run())
+
+# --- LEDs --------------------------------------------------------------------
+
+def bench_led_frames(led_counts, rounds):
+    import effects
+    results = {"numpy": effects.HAS_NUMPY}
+    for count in led_counts:
+        engine = effects.EffectEngine(count, gamma=2.2)
+        colors = [(255, 0, 0) if i % 3 == 0 else (0, 255, 0) for i in range(count)]
+        modes = [effects.PULSE if i % 3 == 0 else effects.STEADY for i in range(count)]
+        engine.set_targets(colors, modes, now=0.0)
+        samples = []
+        for k in range(rounds):
+            t0 = time.perf_counter()
+            frame = engine.render(now=k / effects.FRAME_RATE)
+            engine.dirty(frame, frame)
+            samples.append(time.perf_counter() - t0)
+        results[f"render_{count}"] = _stats(samples)
+    return results
+
+# --- Config ------------------------------------------------------------------
+
+def bench_config(rounds):
+    from config import ConfigManager
+    path = os.path.join(tempfile.mkdtemp(), "config.json")
+    mgr = ConfigManager(path=path, debounce=60) # Writer stays idle: time set() alone
+    set_samples, flush_samples = [], []
+    for i in range(rounds):
+        t0 = time.perf_counter()
+        mgr.set("led_brightness", i)
+        set_samples.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        mgr.flush()
+        flush_samples.append(time.perf_counter() - t0)
+    return {"set": _stats(set_samples), "flush_atomic_write": _stats(flush_samples)}
+
+# --- Main --------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--quick", action="store_true", help="Fewer rounds, for CI smoke runs")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+
+    rounds = 10 if args.quick else 50
+    # main.py and CONFIG use relative paths (config.json, history.db, logs): keep them out of the tree
+    os.chdir(tempfile.mkdtemp(prefix="rack-bench-"))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "sweep": bench_sweeps([5, 20, 50, 100], rounds),
+        "api": bench_api([1, 8, 32], 20 if args.quick else 100),
+        "leds": bench_led_frames([8, 100, 300], rounds * 10),
+        "config": bench_config(rounds),
+    }
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for section in ("sweep", "api", "leds", "config"):
+        print(f"[{section}]")
+        for name, r in report[section].items():
+            if isinstance(r, dict):
+                extra = f"  {r['throughput_rps']} req/s" if "throughput_rps" in r else ""
+                print(f"  {name:<36} mean {r['mean_ms']:>9.3f} ms  p95 {r['p95_ms']:>9.3f} ms{extra}")
+    print(f"\nResults written to {output}")
@@ -3,6 +3,7 @@ from unittest.mock import patch, MagicMock
 import sys
 import os
 import time
+import tempfile
 
 # Add backend to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
@@ -13,7 +14,7 @@ from config import CONFIG
 class TestAutoLocationRobustness(unittest.TestCase):
     @patch('config.CONFIG.get')
     @patch('system.SystemManager.set_timezone')
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_retry_on_fallback(self, mock_get, mock_set_tz, mock_config_get):
         mock_set_tz.return_value = (True, "Success")
         
@@ -28,7 +29,7 @@ class TestAutoLocationRobustness(unittest.TestCase):
         mock_resp_fail.json.return_value = {"status": "fail"}
         mock_get.return_value = mock_resp_fail
         
-        mgr = WeatherManager()
+        mgr = WeatherManager(cache_path=os.path.join(tempfile.mkdtemp(), "weather_cache.json"))
         
         # Initial state
         self.assertFalse(mgr._is_using_auto_fallback)
@@ -60,7 +61,7 @@ class TestAutoLocationRobustness(unittest.TestCase):
 
     @patch('config.CONFIG.get')
     @patch('system.SystemManager.set_timezone')
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_periodic_recheck(self, mock_get, mock_set_tz, mock_config_get):
         mock_set_tz.return_value = (True, "Success")
         mock_config_get.return_value = {"auto": True, "latitude": 0, "longitude": 0, "name": "Unknown"}
@@ -71,7 +72,7 @@ class TestAutoLocationRobustness(unittest.TestCase):
         }
         mock_get.return_value = mock_resp_1
         
-        mgr = WeatherManager()
+        mgr = WeatherManager(cache_path=os.path.join(tempfile.mkdtemp(), "weather_cache.json"))
         mgr.get_weather()
         self.assertEqual(mgr.location_name, "City A")
         
@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from bus import ReadingBus
+
+def readings(*temps):
+    return [{"id": f"s{i}", "temp": t, "status": "normal"} for i, t in enumerate(temps)]
+
+class TestReadingBus(unittest.TestCase):
+    def test_fan_out_and_changes_only(self):
+        bus = ReadingBus()
+        every, changes = [], []
+        bus.subscribe(lambda r, ts: every.append(ts))
+        bus.subscribe(lambda r, ts: changes.append(ts), changes_only=True)
+
+        self.assertTrue(bus.publish(readings(20.0, 21.0), 1.0))
+        self.assertFalse(bus.publish(readings(20.0, 21.0), 2.0)) # Same sweep again
+        self.assertTrue(bus.publish(readings(20.0, 22.0), 3.0))
+        self.assertEqual(every, [1.0, 2.0, 3.0])
+        self.assertEqual(changes, [1.0, 3.0])
+
+        generation, latest, ts = bus.latest()
+        self.assertEqual((generation, latest, ts), (2, readings(20.0, 22.0), 3.0))
+
+    def test_failing_subscriber_does_not_block_others(self):
+        bus = ReadingBus()
+        seen = []
+        bus.subscribe(lambda r, ts: 1 / 0, name="broken")
+        bus.subscribe(lambda r, ts: seen.append(r))
+        bus.publish(readings(20.0), 1.0)
+        self.assertEqual(seen, [readings(20.0)])
+
+    def test_replay_to_late_subscribers(self):
+        bus = ReadingBus()
+        early = []
+        bus.subscribe(lambda r, ts: early.append(ts), replay=True) # Nothing published yet
+        self.assertEqual(early, [])
+
+        bus.publish(readings(20.0), 5.0)
+        late, plain = [], []
+        bus.subscribe(lambda r, ts: late.append((r, ts)), replay=True)
+        bus.subscribe(lambda r, ts: plain.append(ts))
+        self.assertEqual(late, [(readings(20.0), 5.0)])
+        self.assertEqual(plain, [])
+
+        bus.publish(readings(21.0), 6.0)
+        self.assertEqual([ts for _, ts in late], [5.0, 6.0])
+        self.assertEqual(plain, [6.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from cache import ResponseCache
+
+class _Request:
+    def __init__(self, **headers):
+        self.headers = headers
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.builds = 0
+        self.data = {"sensors": [{"id": "a", "temp": 20.0}]}
+
+        def build():
+            self.builds += 1
+            return self.data
+        self.cache = ResponseCache(build)
+
+    def test_rebuilt_only_when_key_changes(self):
+        body, etag = self.cache.get(1)
+        self.assertEqual(body, b'{"sensors":[{"id":"a","temp":20.0}]}')
+        self.assertEqual(self.cache.get(1), (body, etag))
+        self.assertEqual(self.builds, 1)
+
+        self.data = {"sensors": [{"id": "a", "temp": 21.0}]}
+        self.assertEqual(self.cache.get(1), (body, etag)) # Stale until the key moves
+        new_body, new_etag = self.cache.get(2)
+        self.assertEqual(self.builds, 2)
+        self.assertIn(b"21.0", new_body)
+        self.assertNotEqual(new_etag, etag)
+
+    def test_etag_and_not_modified(self):
+        first = self.cache.respond(_Request(), 1)
+        etag = first.headers["etag"]
+        self.assertEqual((first.status_code, first.headers["cache-control"]), (200, "no-cache"))
+        self.assertEqual(first.body, self.cache.get(1)[0])
+
+        again = self.cache.respond(_Request(**{"if-none-match": etag}), 1)
+        self.assertEqual((again.status_code, again.body, again.headers["etag"]), (304, b"", etag))
+
+        self.data = {"sensors": []}
+        changed = self.cache.respond(_Request(**{"if-none-match": etag}), 2)
+        self.assertEqual((changed.status_code, changed.body), (200, b'{"sensors":[]}'))
+        self.assertNotEqual(changed.headers["etag"], etag)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import json
+import shutil
+import tempfile
+import threading
+import time
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from config import ConfigManager
+
+class TestConfigPersistence(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "config.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_concurrent_set_hammer(self):
+        mgr = ConfigManager(path=self.path, debounce=0.2)
+        threads_n, writes_n = 16, 200
+
+        def hammer(t):
+            for i in range(writes_n):
+                mgr.set(f"key_{t}", i)
+                mgr.update_all({"sensor_names": {f"s{t}": f"name {i}"}})
+
+        threads = [threading.Thread(target=hammer, args=(t,)) for t in range(threads_n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        mgr.flush()
+
+        with open(self.path) as f:
+            saved = json.load(f)
+        for t in range(threads_n):
+            self.assertEqual(saved[f"key_{t}"], writes_n - 1)
+            self.assertEqual(saved["sensor_names"][f"s{t}"], f"name {writes_n - 1}")
+
+        # Thousands of set() calls collapse into a handful of writes
+        self.assertLess(mgr.write_count, 10)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_set_does_not_wait_for_disk(self):
+        mgr = ConfigManager(path=self.path, debounce=0.05)
+        real_fsync = os.fsync
+
+        def slow_fsync(fd):
+            time.sleep(0.3)
+            real_fsync(fd)
+
+        with patch('os.fsync', side_effect=slow_fsync):
+            t0 = time.monotonic()
+            for i in range(50):
+                mgr.set("led_brightness", i)
+            elapsed = time.monotonic() - t0
+            self.assertLess(elapsed, 0.2)
+            mgr.flush()
+
+        reloaded = ConfigManager(path=self.path)
+        self.assertEqual(reloaded.get("led_brightness"), 49)
+
+    def test_late_writer_never_overwrites_newer_flush(self):
+        mgr = ConfigManager(path=self.path, debounce=60)
+        mgr.set("led_brightness", 1)
+        with mgr.lock:
+            mgr._serialize() # The background writer took its snapshot...
+        mgr.set("led_brightness", 2)
+        mgr.flush() # ...then a shutdown flush wrote newer data first
+        mgr._write_pending() # ...and the writer finally gets the file
+        self.assertEqual(ConfigManager(path=self.path).get("led_brightness"), 2)
+        self.assertEqual(mgr.write_count, 1)
+
+    def test_flush_lands_a_snapshot_taken_by_the_writer(self):
+        mgr = ConfigManager(path=self.path, debounce=60)
+        mgr.set("temp_unit", "C")
+        with mgr.lock:
+            mgr._serialize() # Nothing dirty any more, but not on disk yet
+        mgr.flush()
+        self.assertEqual(ConfigManager(path=self.path).get("temp_unit"), "C")
+
+    def test_debounced_write_lands_without_flush(self):
+        mgr = ConfigManager(path=self.path, debounce=0.05)
+        mgr.set("temp_unit", "C")
+        deadline = time.time() + 3
+        while not os.path.exists(self.path) and time.time() < deadline:
+            time.sleep(0.02)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)["temp_unit"], "C")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import effects
+from effects import EffectEngine, STEADY, FLASH, FADE_TIME, FLASH_INTERVAL, FRAME_RATE
+
+def pixels(frame):
+    return [EffectEngine.pixel(frame, i) for i in range(len(frame))]
+
+class TestEffectsPurePython(unittest.TestCase):
+    """Per-LED fallback; TestEffectsNumpy runs the same cases vectorized."""
+    numpy = False
+
+    def setUp(self):
+        if self.numpy and not effects.HAS_NUMPY:
+            self.skipTest("numpy not installed")
+        patcher = patch.object(effects, "HAS_NUMPY", self.numpy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_gamma_lut(self):
+        engine = EffectEngine(3, gamma=2.2)
+        self.assertEqual([engine._lut[i] for i in (0, 128, 255)], [0, 56, 255])
+        engine.set_targets([(128, 255, 0), (0, 0, 0), (255, 128, 64)], [STEADY] * 3, now=0.0)
+        self.assertEqual(pixels(engine.render(now=FADE_TIME)), [(56, 255, 0), (0, 0, 0), (255, 56, 12)])
+
+        engine.set_gamma(1.0)
+        self.assertEqual(pixels(engine.render(now=FADE_TIME))[0], (128, 255, 0))
+
+    def test_fade_completes_on_target(self):
+        engine = EffectEngine(2)
+        engine.set_targets([(200, 0, 0), (0, 0, 100)], [STEADY] * 2, now=10.0)
+        self.assertEqual(pixels(engine.render(now=10.0)), [(0, 0, 0), (0, 0, 0)])
+        half = pixels(engine.render(now=10.0 + FADE_TIME / 2))
+        self.assertEqual(half, [(100, 0, 0), (0, 0, 50)]) # Eased curve passes the midpoint at half time
+        self.assertEqual(engine.next_delay(now=10.0 + FADE_TIME / 2), 1.0 / FRAME_RATE)
+
+        done = 10.0 + FADE_TIME
+        self.assertEqual(pixels(engine.render(now=done)), [(200, 0, 0), (0, 0, 100)])
+        self.assertIsNone(engine.next_delay(now=done)) # Static until the next change
+
+        # A new target fades from what is showing, not from black
+        engine.set_targets([(0, 0, 0), (0, 0, 100)], [STEADY] * 2, now=20.0)
+        self.assertEqual(pixels(engine.render(now=20.0)), [(200, 0, 0), (0, 0, 100)])
+        self.assertEqual(pixels(engine.render(now=20.0 + FADE_TIME)), [(0, 0, 0), (0, 0, 100)])
+
+    def test_flash_dims_on_its_keyframe(self):
+        engine = EffectEngine(2)
+        engine.set_targets([(255, 0, 0), (0, 255, 0)], [FLASH, STEADY], now=0.0)
+        bright = pixels(engine.render(now=2.0))
+        dim = pixels(engine.render(now=2.0 + FLASH_INTERVAL))
+        self.assertEqual(bright, [(255, 0, 0), (0, 255, 0)])
+        self.assertEqual(dim, [(50, 0, 0), (0, 255, 0)])
+        self.assertAlmostEqual(engine.next_delay(now=2.1), FLASH_INTERVAL - 0.1 + 0.001)
+
+    def test_dirty_frame_diff(self):
+        engine = EffectEngine(4)
+        engine.set_targets([(10, 10, 10)] * 4, [STEADY] * 4, now=0.0)
+        last = engine.render(now=FADE_TIME)
+        self.assertEqual(EffectEngine.dirty(engine.render(now=FADE_TIME + 1), last), [])
+
+        engine.set_targets([(10, 10, 10), (10, 10, 11), (10, 10, 10), (90, 0, 0)], [STEADY] * 4, now=5.0)
+        self.assertEqual(EffectEngine.dirty(engine.render(now=5.0 + FADE_TIME), last), [1, 3])
+
+        engine.resize(2)
+        self.assertEqual(EffectEngine.dirty(engine.render(now=10.0), last), [0, 1]) # Strip resized: repaint all
+
+class TestEffectsNumpy(TestEffectsPurePython):
+    numpy = True
+
+if __name__ == '__main__':
+    unittest.main()
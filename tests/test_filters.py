@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from filters import ReadingFilter, SENTINEL, OUT_OF_RANGE, SPIKE
+from metrics import SENSOR_READ_RETRIES
+from test_simulators import SimulatorTestCase
+
+class TestReadingFilter(unittest.TestCase):
+    def test_sentinels_and_range(self):
+        f = ReadingFilter()
+        self.assertEqual(f.check("a", 85.0, now=0), SENTINEL) # Power-on value with no history
+        self.assertEqual(f.check("a", -127.0, now=1), SENTINEL)
+        self.assertEqual(f.check("a", 140.0, now=2), OUT_OF_RANGE)
+        self.assertEqual(f.held("a", now=2), (None, True, False))
+
+        self.assertIsNone(f.check("hot", 84.0, now=0))
+        self.assertIsNone(f.check("hot", 85.0, now=5)) # Plausible when already that hot
+
+    def test_spike_rejected_step_confirmed(self):
+        f = ReadingFilter()
+        f.check("a", 24.0, now=0)
+        self.assertEqual(f.check("a", 40.0, now=5), SPIKE)
+        self.assertEqual(f.held("a", now=5), (24.0, True, False))
+        self.assertIsNone(f.check("a", 24.2, now=10)) # One-off spike: back to normal
+        self.assertEqual(f.held("a", now=10), (24.2, False, False))
+
+        self.assertEqual(f.check("a", 34.0, now=15), SPIKE)
+        self.assertIsNone(f.check("a", 34.5, now=20)) # Real step: seen twice
+        self.assertEqual(f.held("a", now=20)[0], 34.5)
+
+    def test_hold_expires(self):
+        f = ReadingFilter(hold_limit=60)
+        f.check("a", 24.0, now=0)
+        f.fail("a", now=10)
+        self.assertEqual(f.held("a", now=69), (24.0, True, False))
+        self.assertEqual(f.held("a", now=70), (24.0, True, True))
+        self.assertIsNone(f.check("a", 31.0, now=80)) # Long gap: re-anchors, no spike check
+
+class TestFilteredSweeps(SimulatorTestCase):
+    def test_failed_reads_hold_last_good_value(self):
+        tree, mgr = self.make_manager(3, bulk=False)
+        first = {r["id"]: r for r in mgr.sweep()}
+        self.assertTrue(all(r["status"] == "normal" and not r["stale"] for r in first.values()))
+
+        sensor_id = tree.sensor_ids()[0]
+        retries = SENSOR_READ_RETRIES.labels(sensor_id).value
+        tree.crc_fail_rate = 1.0
+        held = {r["id"]: r for r in mgr.sweep()}
+        self.assertEqual(SENSOR_READ_RETRIES.labels(sensor_id).value, retries + 2)
+        for sid, r in held.items():
+            self.assertEqual((r["temp"], r["status"], r["stale"]), (first[sid]["temp"], "normal", True))
+
+        # Already failing: one read per sweep, no retries
+        reads = tree.read_count
+        mgr.sweep()
+        self.assertEqual(tree.read_count, reads + 3)
+        self.assertEqual(SENSOR_READ_RETRIES.labels(sensor_id).value, retries + 2)
+
+        # After the hold limit the probe reports an error, still at its last good value
+        for state in mgr.filter._probes.values():
+            state.failing_since -= mgr.filter.hold_limit
+        expired = mgr.sweep()
+        self.assertTrue(all(r["status"] == "error" and r["temp"] != 0.0 for r in expired))
+
+    def test_power_on_value_never_published(self):
+        tree, mgr = self.make_manager(5, sentinel_rate=0.5)
+        for _ in range(10):
+            readings = mgr.sweep()
+            self.assertFalse([r for r in readings if r["temp"] == 85.0])
+            self.assertFalse([r for r in readings if r["status"] == "critical"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from config import CONFIG
+from fleet import FleetManager, peer_config
+
+class _StubNode(BaseHTTPRequestHandler):
+    """A peer's /api/status with ETag / If-None-Match, like ResponseCache."""
+    protocol_version = "HTTP/1.1" # Keep-alive
+
+    def do_GET(self):
+        node = self.server.node
+        node["hits"] += 1
+        body = json.dumps({"sensors": node["sensors"], "unit": node["unit"]}).encode()
+        etag = f'"{hash(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestFleet(unittest.TestCase):
+    def setUp(self):
+        self._saved = {k: CONFIG._config.get(k) for k in ("fleet", "temp_unit")}
+        self.addCleanup(CONFIG._config.update, self._saved)
+        self.nodes = []
+        for unit, temp in (("F", 77.0), ("C", 30.0)):
+            server = ThreadingHTTPServer(("127.0.0.1", 0), _StubNode)
+            server.node = {"unit": unit, "hits": 0, "sensors": [
+                {"id": "28-a", "name": "Intake", "temp": temp, "status": "normal"},
+                {"id": "28-b", "name": "Exhaust", "temp": 0.0, "status": "error"},
+                {"id": "empty-1", "name": "Empty Slot", "temp": 0.0, "status": "empty"}]}
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.addCleanup(server.server_close)
+            self.addCleanup(server.shutdown)
+            self.nodes.append(server)
+        peers = [{"url": f"127.0.0.1:{s.server_address[1]}", "name": f"rack-{i}"} for i, s in enumerate(self.nodes)]
+        peers.append("http://127.0.0.1:1") # Nothing listening
+        CONFIG._config.update({"fleet": {"peers": peers}, "temp_unit": "C"})
+        self.mgr = FleetManager(autostart=False, history_path=os.path.join(tempfile.mkdtemp(), "fleet.db"))
+        self.addCleanup(self.mgr.close)
+
+    def test_peer_config(self):
+        self.assertEqual(peer_config("rack-a.local:8000/"), {"url": "http://rack-a.local:8000", "name": "rack-a.local"})
+
+    def test_merged_view_and_conditional_polls(self):
+        self.assertTrue(self.mgr.refresh())
+        view = self.mgr.view()
+        by_name = {p["name"]: p for p in view["peers"]}
+        self.assertEqual(by_name["rack-0"]["sensors"][0]["temp"], 25.0) # 77F in this node's unit
+        self.assertEqual(len(by_name["rack-1"]["sensors"]), 2) # Empty slots dropped
+        self.assertEqual(by_name["rack-0"]["sensors"][1]["temp"], 0.0) # Placeholder, not 0F -> -17.8C
+        self.assertFalse(by_name["127.0.0.1"]["online"])
+        self.assertEqual(view["summary"]["online"], 2)
+        self.assertEqual(view["summary"]["hottest"]["peer"], "rack-1")
+
+        # Nothing changed: every peer answers 304 and the generation stays
+        generation = view["generation"]
+        self.assertFalse(self.mgr.refresh())
+        self.assertEqual(self.mgr.generation, generation)
+        self.assertEqual([s.node["hits"] for s in self.nodes], [2, 2])
+        # ...but the peers were seen again
+        self.assertGreater(self.mgr.view()["peers"][0]["last_seen"], view["peers"][0]["last_seen"])
+
+        self.nodes[0].node["sensors"][0]["status"] = "warning"
+        self.assertTrue(self.mgr.refresh())
+        self.assertEqual(self.mgr.view()["summary"]["statuses"]["warning"], 1)
+
+    def test_history_is_recorded_per_peer(self):
+        self.mgr.refresh()
+        history = self.mgr.query_history(peer="rack-0")
+        self.assertEqual(list(history["series"]), ["rack-0/28-a"])
+        self.assertEqual(history["series"]["rack-0/28-a"][0][1], 25.0)
+        # A probe id alone matches it on every peer
+        self.assertEqual(sorted(self.mgr.query_history(sensor="28-a")["series"]), ["rack-0/28-a", "rack-1/28-a"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from config import CONFIG
+from history import HistoryStore
+
+DAY = 86400
+
+def reading(sensor_id, temp, status="normal"):
+    return {"id": sensor_id, "name": sensor_id, "temp": temp, "status": status}
+
+class HistoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self._saved = {k: CONFIG._config.get(k) for k in
+                       ("temp_unit", "history_retention_days", "history_rollup_retention_days")}
+        self.addCleanup(CONFIG._config.update, self._saved)
+        CONFIG._config.update({"temp_unit": "C", "history_retention_days": 30, "history_rollup_retention_days": 365})
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.store = HistoryStore(os.path.join(self.tmpdir, "history.db"), min_interval=0)
+        self.addCleanup(self.store.close)
+        self.now = int(time.time())
+        self.base = (self.now // 3600 - 3) * 3600 # A few whole hours ago
+
+    def rows(self, sql, *args):
+        return self.store._conn.execute(sql, args).fetchall()
+
+class TestRollups(HistoryTestCase):
+    def test_pick_resolution(self):
+        self.assertEqual([HistoryStore.pick_resolution(s) for s in (10, 60, 899, 900, 7200)],
+                         [0, 60, 60, 900, 3600])
+
+    def test_rollups_aggregate_min_max_avg(self):
+        for offset, temp in ((0, 20.0), (5, 22.0), (10, 24.0), (65, 30.0)):
+            self.store.record([reading("a", temp)], self.base + offset)
+
+        minute = self.store.query(sensor="a", start=self.base, end=self.base + 119, step=60)
+        self.assertEqual(minute["resolution"], 60)
+        self.assertEqual(minute["series"]["a"], [[self.base, 22.0, 20.0, 24.0], [self.base + 60, 30.0, 30.0, 30.0]])
+
+        hour = self.store.query(sensor="a", start=self.base, end=self.base + 3599, step=3600)
+        self.assertEqual(hour["resolution"], 3600)
+        self.assertEqual(hour["series"]["a"], [[self.base, 24.0, 20.0, 30.0]])
+
+    def test_buckets_align_to_start(self):
+        for t in range(self.base, self.base + 4 * 3600, 60):
+            self.store.record([reading("a", 20.0)], t)
+        start = self.base + 1200
+        result = self.store.query(sensor="a", start=start, end=start + 3 * 3599, points=3)
+        self.assertEqual(result["resolution"], 900)
+        self.assertEqual(result["step"], 2700) # 3599 rounded down to whole 15m rollups
+        stamps = [row[0] for row in result["series"]["a"]]
+        self.assertEqual(stamps[0], start)
+        self.assertTrue(all((ts - start) % result["step"] == 0 for ts in stamps))
+
+        raw = self.store.query(sensor="a", start=start + 7, end=start + 600, step=45)
+        self.assertTrue(all(row[0] >= start + 7 and (row[0] - start - 7) % 45 == 0 for row in raw["series"]["a"]))
+
+    def test_prune_keeps_each_resolution_for_its_own_period(self):
+        ages = (400, 100, 40, 1)
+        for age in ages:
+            self.store.record([reading("a", 20.0)], self.now - age * DAY)
+        self.store.prune(self.now)
+
+        def kept(res):
+            if res == 0:
+                stamps = [ts for (ts,) in self.rows("SELECT ts FROM samples")]
+            else:
+                stamps = [b for (b,) in self.rows("SELECT bucket FROM rollups WHERE res = ?", res)]
+            return sorted({age for age in ages for ts in stamps if abs(self.now - age * DAY - ts) < res + 1})
+
+        self.assertEqual(kept(0), [1])
+        self.assertEqual(kept(60), [1])
+        self.assertEqual(kept(900), [1, 40])
+        self.assertEqual(kept(3600), [1, 40, 100])
+
+    def test_old_ranges_use_a_resolution_that_still_exists(self):
+        start = self.now - 60 * DAY # 1m rollups are gone by now
+        result = self.store.query(start=start, end=start + 3600, step=60)
+        self.assertEqual(result["resolution"], 900)
+
+class TestRecordAndQuery(HistoryTestCase):
+    def test_stored_in_celsius_served_in_configured_unit(self):
+        CONFIG._config["temp_unit"] = "F"
+        self.store.record([reading("a", 77.0)], self.base)
+        self.assertEqual(self.rows("SELECT temp FROM samples"), [(25.0,)])
+        self.assertEqual(self.store.query(sensor="a", start=self.base, end=self.base + 9, step=10)["series"]["a"],
+                         [[self.base, 77.0, 77.0, 77.0]])
+
+        CONFIG._config["temp_unit"] = "C" # A unit switch doesn't rewrite history
+        result = self.store.query(sensor="a", start=self.base, end=self.base + 9, step=10)
+        self.assertEqual((result["unit"], result["series"]["a"][0][1]), ("C", 25.0))
+
+    def test_min_interval_throttles_records(self):
+        store = HistoryStore(os.path.join(self.tmpdir, "throttled.db"), min_interval=4.5)
+        self.addCleanup(store.close)
+        for offset in (0, 1, 2, 4.4, 5, 9.4, 10):
+            store.record([reading("a", 20.0)], self.base + offset)
+        stamps = [ts - self.base for (ts,) in store._conn.execute("SELECT ts FROM samples ORDER BY ts")]
+        self.assertEqual(stamps, [0, 5, 10])
+
+    def test_only_real_measurements_are_recorded(self):
+        self.store.record([reading("ok", 20.0), reading("hot", 40.0, "critical"), reading("err", 0.0, "error"),
+                           reading("gone", 0.0, "searching"), reading("empty-1", 0.0, "empty"),
+                           dict(reading("held", 21.0), stale=True)], self.base)
+        series = self.store.query(start=self.base, end=self.base + 9, step=10)["series"]
+        self.assertEqual(sorted(series), ["hot", "ok"])
+
+    def test_sensor_and_prefix_filters(self):
+        self.store.record([reading("rack-a/1", 20.0), reading("rack-a/2", 21.0), reading("rack-b/1", 22.0)], self.base)
+        query = lambda **kw: sorted(self.store.query(start=self.base, end=self.base + 9, step=10, **kw)["series"])
+        self.assertEqual(query(sensor="rack-a/2"), ["rack-a/2"])
+        self.assertEqual(query(prefix="rack-a/"), ["rack-a/1", "rack-a/2"])
+        self.assertEqual(query(suffix="/1"), ["rack-a/1", "rack-b/1"])
+        self.assertEqual(query(), ["rack-a/1", "rack-a/2", "rack-b/1"])
+        self.assertEqual(query(sensor="unknown"), [])
+
+if __name__ == '__main__':
+    unittest.main()
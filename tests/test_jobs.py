@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from jobs import JobQueue
+
+class TestJobQueue(unittest.TestCase):
+    def test_burst_is_merged_into_one_job(self):
+        applied = []
+        queue = JobQueue(lambda changes: applied.append(changes) or "ok", coalesce=0.1)
+
+        jobs = [queue.submit({"led_brightness": b, "mock_mode": b % 2 == 0}) for b in range(20)]
+        self.assertEqual({j["id"] for j in jobs}, {jobs[0]["id"]})
+
+        done = queue.wait(jobs[0]["id"], timeout=2)
+        self.assertEqual(done["status"], "done")
+        self.assertEqual(done["merged"], 19)
+        self.assertEqual(applied, [{"led_brightness": 19, "mock_mode": False}])
+
+        # Next submission after it ran is a new job
+        self.assertNotEqual(queue.submit({"led_brightness": 1})["id"], jobs[0]["id"])
+
+    def test_submit_does_not_wait_for_slow_apply(self):
+        release = threading.Event()
+
+        def slow_apply(changes):
+            release.wait(2)
+            if "ntp_server" in changes:
+                raise RuntimeError("System command failed")
+            return "ok"
+
+        queue = JobQueue(slow_apply, coalesce=0)
+        first = queue.submit({"latitude": 1.0})
+        time.sleep(0.1) # First job is now running
+        t0 = time.perf_counter()
+        second = queue.submit({"ntp_server": "pool.ntp.org"})
+        self.assertLess(time.perf_counter() - t0, 0.05)
+        self.assertNotEqual(first["id"], second["id"])
+        self.assertEqual(queue.get(first["id"])["status"], "running")
+
+        release.set()
+        self.assertEqual(queue.wait(first["id"], timeout=2)["status"], "done")
+        failed = queue.wait(second["id"], timeout=2)
+        self.assertEqual(failed["status"], "failed")
+        self.assertIn("System command failed", failed["message"])
+        self.assertIsNone(queue.get("missing"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import logging
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from logs import LogPipeline, RepeatFilter
+
+def _record(msg, created, **fields):
+    record = logging.LogRecord("rack.test", logging.ERROR, __file__, 1, msg, None, None)
+    record.created = created
+    record.fields = fields
+    return record
+
+class TestRepeatFilter(unittest.TestCase):
+    def test_identical_errors_are_collapsed_within_window(self):
+        f = RepeatFilter(window=60)
+        self.assertTrue(f.filter(_record("Sensor Read Error", 0, sensor="28-a")))
+        for t in range(1, 12):
+            self.assertFalse(f.filter(_record("Sensor Read Error", t * 5, sensor="28-a")))
+        # A different sensor is a different message
+        self.assertTrue(f.filter(_record("Sensor Read Error", 10, sensor="28-b")))
+
+        # After the window the next one goes through and reports what was dropped
+        record = _record("Sensor Read Error", 61, sensor="28-a")
+        self.assertTrue(f.filter(record))
+        self.assertEqual(record.fields["repeats"], 11)
+
+class TestLogPipeline(unittest.TestCase):
+    def test_writes_off_thread_and_rotates(self):
+        tmp = tempfile.mkdtemp()
+        path = os.path.join(tmp, "debug.log")
+        pipeline = LogPipeline(path, max_bytes=2000, backups=2, console=False)
+        logger = logging.getLogger("rack-test-pipeline")
+        pipeline.attach(logger)
+        self.addCleanup(logger.removeHandler, pipeline.handler)
+
+        for i in range(200):
+            logger.info("Weather updated", extra={"fields": {"n": i, "location": "New York"}})
+        pipeline.stop()
+
+        with open(path) as f:
+            last = f.read().strip().splitlines()[-1]
+        self.assertIn("[rack-test-pipeline] Weather updated n=199 location='New York'", last)
+        self.assertTrue(os.path.exists(path + ".1"))
+        self.assertFalse(os.path.exists(path + ".3"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from metrics import Counter, Histogram, Registry, SENSOR_READ_ERRORS, SENSOR_TEMPERATURE, SWEEP_SECONDS
+from test_simulators import SimulatorTestCase
+
+class TestMetricTypes(unittest.TestCase):
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = Registry()
+        hist = registry.register(Histogram("t_seconds", "test", ("route",), buckets=(0.1, 1.0)))
+        child = hist.labels("/a")
+        for value in (0.05, 0.5, 0.5, 5.0):
+            child.observe(value)
+        text = registry.render()
+        self.assertIn('t_seconds_bucket{route="/a",le="0.1"} 1', text)
+        self.assertIn('t_seconds_bucket{route="/a",le="1.0"} 3', text)
+        self.assertIn('t_seconds_bucket{route="/a",le="+Inf"} 4', text)
+        self.assertIn('t_seconds_count{route="/a"} 4', text)
+        self.assertIn("# TYPE t_seconds histogram", text)
+
+    def test_label_children_are_reused(self):
+        counter = Counter("c_total", "test", ("kind",))
+        self.assertIs(counter.labels("crc"), counter.labels("crc"))
+        counter.labels("crc").inc()
+        counter.labels("crc").inc(2)
+        self.assertEqual(counter.labels("crc").value, 3)
+
+class TestSweepInstrumentation(SimulatorTestCase):
+    def test_sweep_records_temps_errors_and_duration(self):
+        tree, mgr = self.make_manager(3, crc_fail_rate=1.0, bulk=False)
+        sweeps_before = SWEEP_SECONDS._unlabeled.count
+        sensor_id = tree.sensor_ids()[0]
+        errors_before = SENSOR_READ_ERRORS.labels(sensor_id, "crc").value
+
+        mgr.sweep()
+        self.assertEqual(SWEEP_SECONDS._unlabeled.count, sweeps_before + 1)
+        self.assertEqual(SENSOR_READ_ERRORS.labels(sensor_id, "crc").value, errors_before + 1)
+
+        tree.crc_fail_rate = 0.0
+        tree.set_temperature(sensor_id, 30.0)
+        mgr.sweep()
+        self.assertAlmostEqual(SENSOR_TEMPERATURE.labels(sensor_id).value, 30.0, delta=0.5)
+
+    def test_unplugged_probe_stops_exporting_its_temperature(self):
+        tree, mgr = self.make_manager(2)
+        mgr.sweep()
+        gone, kept = tree.sensor_ids()
+        self.assertIs(mgr._metrics(gone)[1], SENSOR_TEMPERATURE.labels(gone)) # Bound once, reused
+        self.assertIn(f'sensor="{gone}"', "\n".join(self.render_temperatures()))
+
+        tree.remove_sensor(gone)
+        mgr.sweep() # Read error: the probe is rediscovered away on the next sweep
+        mgr.sweep()
+        rendered = "\n".join(self.render_temperatures())
+        self.assertNotIn(f'sensor="{gone}"', rendered)
+        self.assertIn(f'sensor="{kept}"', rendered)
+
+    @staticmethod
+    def render_temperatures():
+        out = []
+        SENSOR_TEMPERATURE.render(out)
+        return out
+
+if __name__ == '__main__':
+    unittest.main()
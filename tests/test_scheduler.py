@@ -0,0 +1,114 @@
+import unittest
+import random
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from scheduler import SamplingScheduler, FAST, NORMAL, SLOW, lsb
+from test_simulators import SimulatorTestCase
+
+WARNING_C = 26.7 # 80F
+
+class TestSamplingScheduler(unittest.TestCase):
+    def test_tiers(self):
+        sched = SamplingScheduler()
+        # Stable, well below warning: slows down and drops resolution after a few samples
+        for t in range(0, 50, 5):
+            sched.record("ambient", 18.0, WARNING_C, now=t)
+        self.assertEqual(sched.stats()["ambient"]["tier"], SLOW)
+        self.assertEqual(sched.resolution("ambient"), 10)
+        self.assertEqual(sched.due(["ambient"], now=50), [])
+        self.assertEqual(sched.due(["ambient"], now=60), ["ambient"])
+
+        # Near warning: fast
+        sched.record("exhaust", 25.0, WARNING_C, now=0)
+        self.assertEqual(sched.stats()["exhaust"]["tier"], FAST)
+        self.assertEqual(sched.due(["exhaust"], now=1.0), ["exhaust"])
+
+        # Far from warning but climbing 2C/min: fast
+        sched.record("intake", 18.0, WARNING_C, now=0)
+        sched.record("intake", 18.2, WARNING_C, now=5)
+        self.assertEqual(sched.stats()["intake"]["tier"], FAST)
+
+        # Unknown probes are due right away
+        self.assertEqual(sched.due(["new"], now=0), ["new"])
+
+    def test_failed_reads_back_off(self):
+        sched = SamplingScheduler()
+        now = 0.0
+        delays = []
+        for _ in range(5):
+            sched.record_error("dead", now=now)
+            delay = sched._probes["dead"].next_due - now
+            self.assertEqual(sched.due(["dead"], now=now + delay - 0.01), [])
+            delays.append(delay)
+            now += delay
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 5.0, 5.0]) # fast_interval doubling, capped at normal_interval
+
+        # A good read ends the streak
+        sched.record("dead", 20.0, WARNING_C, now=now)
+        sched.record_error("dead", now=now)
+        self.assertEqual(sched._probes["dead"].next_due, now + 1.0)
+
+    def test_quantization_noise_is_not_a_trend(self):
+        sched = SamplingScheduler()
+        rng = random.Random(7)
+        now, tiers = 0.0, []
+        while now < 3600:
+            # Flat probe with +-1 LSB (12-bit) flicker, read at its current resolution;
+            # 20.125C sits on a 10-bit rounding boundary
+            step = lsb(sched.resolution("flat"))
+            sched.record("flat", round((20.125 + rng.choice((-1, 0, 1)) * lsb(12)) / step) * step, WARNING_C, now=now)
+            tiers.append(sched.stats()["flat"]["tier"])
+            now = sched._probes["flat"].next_due
+        self.assertEqual(tiers.count(FAST), 0)
+        self.assertEqual(tiers[-1], SLOW)
+        self.assertLess(len(tiers), 3600 / 5) # Fewer reads than the fixed 5s loop
+
+        # A real slow climb still registers
+        for t in range(0, 65, 5):
+            sched.record("climb", 18.0 + t / 60, WARNING_C, now=t) # 1C/min
+        self.assertEqual(sched.stats()["climb"]["tier"], FAST)
+
+    def test_disabled_via_config(self):
+        sched = SamplingScheduler({"adaptive": False, "slow_resolution": 7})
+        self.assertFalse(sched.enabled)
+        self.assertEqual(sched.resolutions[SLOW], 9) # Clamped to the DS18B20 range
+        self.assertEqual(sched.resolutions[NORMAL], 12)
+
+class TestScheduledSweeps(SimulatorTestCase):
+    def test_only_due_probes_are_read(self):
+        tree, mgr = self.make_manager(4, bulk=False)
+        hot = tree.sensor_ids()[0]
+        tree.set_temperature(hot, 78.0) # Near the 80 (C in these tests) warning
+        mgr.sweep()
+        reads = tree.read_count
+
+        readings = mgr.sweep(scheduled=True) # Immediately after: nothing due
+        self.assertEqual(tree.read_count, reads)
+        self.assertEqual(len([r for r in readings if r["status"] != "empty"]), 4)
+
+        # Fast-forward: only the hot probe is due
+        for sensor_id in tree.sensor_ids():
+            mgr.scheduler._probes[sensor_id].next_due = 0 if sensor_id == hot else float("inf")
+        mgr.sweep(scheduled=True)
+        self.assertEqual(tree.read_count, reads + 1)
+
+        # The hot probe was switched to the fast tier's resolution
+        with open(os.path.join(tree.devices_dir, hot, "resolution")) as f:
+            self.assertEqual(f.read().strip(), "11")
+        self.assertEqual(mgr.get_sweep_stats()["read"], 1)
+
+    def test_failing_probe_waits_for_its_backoff(self):
+        tree, mgr = self.make_manager(3, bulk=False, crc_fail_rate=1.0)
+        mgr.sweep(scheduled=True) # Never read good: still waits for its due time afterwards
+        reads = tree.read_count
+        for _ in range(5):
+            mgr.sweep(scheduled=True)
+        self.assertEqual(tree.read_count, reads)
+        self.assertGreaterEqual(mgr.scheduler.next_delay(), 0.9)
+
+if __name__ == '__main__':
+    unittest.main()
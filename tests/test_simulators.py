@@ -0,0 +1,165 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import time
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from config import CONFIG
+from sensors import SensorManager, parse_w1_slave
+from leds import LEDManager
+from simulators import FakeW1Tree, FakeNeoPixel
+
+class SimulatorTestCase(unittest.TestCase):
+    def setUp(self):
+        # Keep CONFIG in memory: never write config.json from tests
+        self._saved = {k: CONFIG._config.get(k) for k in ("mock_mode", "sensor_slots", "sensor_order", "temp_unit")}
+        save_patch = patch.object(CONFIG, "save")
+        save_patch.start()
+        self.addCleanup(save_patch.stop)
+        CONFIG._config.update({"mock_mode": False, "sensor_order": [], "temp_unit": "C"})
+        self.trees = []
+
+    def tearDown(self):
+        CONFIG._config.update(self._saved)
+        for tree in self.trees:
+            tree.cleanup()
+
+    def make_manager(self, sensors, **tree_kwargs):
+        tree = FakeW1Tree(sensors=sensors, **tree_kwargs)
+        self.trees.append(tree)
+        CONFIG._config["sensor_slots"] = sensors
+        mgr = SensorManager(autostart=False, devices_dir=tree.devices_dir, sensor_factory=tree.sensor_factory)
+        self.addCleanup(mgr._read_pool.shutdown, wait=False)
+        return tree, mgr
+
+class TestSimulatedSensors(SimulatorTestCase):
+    def test_sweep_scales_to_100_probes(self):
+        for count in (5, 100):
+            tree, mgr = self.make_manager(count, masters=3, conversion_time=0.1)
+            self.assertEqual(len(mgr._bulk_masters), 3)
+
+            readings = mgr.sweep()
+            self.assertEqual(len(readings), count)
+            self.assertTrue(all(r["status"] == "normal" for r in readings))
+            # Bulk conversion: one conversion time per sweep, not one per probe
+            self.assertLess(mgr.get_sweep_stats()["read_duration"], 0.5)
+
+    def test_per_device_reads_without_bulk(self):
+        tree, mgr = self.make_manager(20, conversion_time=0.1, bulk=False)
+        self.assertEqual(mgr._bulk_masters, [])
+        readings = mgr.sweep()
+        self.assertTrue(all(r["status"] == "normal" for r in readings))
+        self.assertLess(mgr.get_sweep_stats()["read_duration"], 0.5)
+
+    def test_crc_failures_and_unplug_report_errors(self):
+        tree, mgr = self.make_manager(5, crc_fail_rate=1.0, bulk=False)
+        self.assertTrue(all(r["status"] == "error" for r in mgr.sweep()))
+
+        tree.crc_fail_rate = 0.0
+        gone = tree.sensor_ids()[0]
+        tree.remove_sensor(gone)
+        by_id = {r["id"]: r for r in mgr.sweep()}
+        self.assertEqual(by_id[gone]["status"], "error")
+        self.assertEqual(sum(r["status"] == "normal" for r in by_id.values()), 4)
+
+    def test_native_reader_parses_bytes_and_keeps_descriptors(self):
+        slave = b"ff ff : crc=57 YES\nff ff t=-10062\n"
+        self.assertEqual(parse_w1_slave(bytearray(slave), len(slave)), -10062)
+        with self.assertRaisesRegex(Exception, "CRC"):
+            parse_w1_slave(bytearray(slave.replace(b"YES", b"NO")), len(slave))
+
+        tree, mgr = self.make_manager(2, bulk=False)
+        mgr.sweep()
+        probe = mgr.sensors[0]
+        fds = dict(probe._fds)
+        tree.listeners.append(mgr.watcher.notify)
+        tree.add_sensor()
+        mgr.sweep() # Rescan keeps the existing probe objects and their descriptors
+        self.assertIs(mgr.sensors[0], probe)
+        self.assertEqual(probe._fds, fds)
+
+class TestHotPlug(SimulatorTestCase):
+    def test_probes_added_and_removed_within_one_sweep(self):
+        tree, mgr = self.make_manager(3)
+        CONFIG._config["sensor_slots"] = 5
+        mgr.reload_config()
+        tree.listeners.append(mgr.watcher.notify)
+        mgr.sweep()
+
+        with patch.object(mgr, "_init_real_sensors", wraps=mgr._init_real_sensors) as scans:
+            for _ in range(3):
+                mgr.sweep()
+            self.assertEqual(scans.call_count, 0) # Nothing changed: no discovery I/O
+
+            new_id = tree.add_sensor()
+            readings = mgr.sweep()
+            self.assertEqual(scans.call_count, 1)
+            self.assertIn(new_id, [r["id"] for r in readings if r["status"] == "normal"])
+
+            gone = tree.sensor_ids()[0]
+            tree.remove_sensor(gone)
+            by_id = {r["id"]: r for r in mgr.sweep()}
+            self.assertEqual(by_id[gone]["status"], "searching")
+            self.assertEqual(scans.call_count, 2)
+
+    def test_unplug_without_event_rescans_after_read_error(self):
+        tree, mgr = self.make_manager(2)
+        mgr.sweep()
+        gone = tree.sensor_ids()[1]
+        tree.remove_sensor(gone) # No listener: the event was missed
+        self.assertEqual({r["id"]: r for r in mgr.sweep()}[gone]["status"], "error")
+        self.assertEqual({r["id"]: r for r in mgr.sweep()}[gone]["status"], "searching")
+
+class TestFakeNeoPixel(SimulatorTestCase):
+    def test_layout_change_reapplies_last_sweep(self):
+        for key in ("led_count", "led_map"):
+            self.addCleanup(CONFIG._config.__setitem__, key, CONFIG._config.get(key))
+        CONFIG._config.update({"led_count": 8, "led_map": []})
+        leds = LEDManager(pixels=FakeNeoPixel(8))
+        self.addCleanup(leds.cleanup)
+        leds.update_from_sensors([{"id": f"s{i}", "temp": 20.0, "status": "normal"} for i in range(5)])
+
+        # No new sweep arrives (change-only delivery on a steady rack)
+        CONFIG._config.update({"led_count": 4, "led_map": [0, -1, 1, 2]})
+        leds.reload_config()
+        self.assertEqual(leds.current_colors, [(0, 255, 0), (0, 0, 0), (0, 255, 0), (0, 255, 0)])
+
+
+    def test_frames_recorded_only_on_change(self):
+        strip = FakeNeoPixel(8)
+        leds = LEDManager(pixels=strip)
+        self.addCleanup(leds.cleanup)
+
+        leds.update_from_sensors([{"id": f"s{i}", "temp": 20.0, "status": "normal"} for i in range(5)])
+        deadline = time.time() + 3
+        while (not strip.frames or strip.frames[-1][1][0] != (0, 255, 0)) and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(strip.frames[-1][1], tuple([(0, 255, 0)] * 8))
+
+        # Static strip: no further transfers
+        time.sleep(0.1)
+        shows = strip.show_count
+        time.sleep(0.3)
+        self.assertEqual(strip.show_count, shows)
+
+    def test_brightness_change_costs_one_show(self):
+        strip = FakeNeoPixel(8)
+        leds = LEDManager(pixels=strip)
+        self.addCleanup(leds.cleanup)
+        time.sleep(0.2)
+        shows, writes = strip.show_count, strip.pixel_writes
+
+        leds.set_brightness(64)
+        deadline = time.time() + 2
+        while strip.show_count == shows and time.time() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.2)
+        self.assertEqual(strip.show_count, shows + 1)
+        self.assertEqual(strip.pixel_writes, writes) # Same frame, only the brightness changed
+        self.assertAlmostEqual(strip.brightness, 64 / 255)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import asyncio
+import json
+import time
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import stream
+from stream import StreamHub
+
+NOW = time.mktime((2024, 5, 1, 12, 0, 0, 0, 0, -1))
+
+class _Request:
+    async def is_disconnected(self):
+        return False
+
+def parse(message: bytes):
+    lines = message.decode().strip().split("\n")
+    fields = dict(line.split(": ", 1) for line in lines)
+    return fields["event"], json.loads(fields["data"])
+
+def readings(*temps):
+    return [{"id": f"s{i}", "name": f"Probe {i + 1}", "temp": t, "status": "normal"} for i, t in enumerate(temps)]
+
+class TestStreamHub(unittest.TestCase):
+    def run_async(self, coro):
+        return asyncio.run(asyncio.wait_for(coro, 5))
+
+    def test_snapshot_then_deltas_fan_out_to_every_client(self):
+        async def scenario():
+            hub = StreamHub()
+            hub.bind_loop(asyncio.get_running_loop())
+            hub.publish(readings(20.0, 21.0, 22.0), NOW)
+            clients = [hub.events(_Request()) for _ in range(3)]
+            snapshots = [parse(await c.__anext__()) for c in clients]
+            self.assertEqual(hub.client_count, 3)
+
+            hub.publish(readings(20.0, 25.0, 22.0), NOW) # Only slot 1 changed
+            hub.publish(readings(20.0, 25.0, 22.0), NOW) # Nothing changed: no message
+            hub.publish(readings(20.0, 25.0, 23.0), NOW)
+            received = [[parse(await c.__anext__()) for _ in range(2)] for c in clients]
+            for c in clients:
+                await c.aclose()
+            return hub, snapshots, received
+
+        hub, snapshots, received = self.run_async(scenario())
+        for event, data in snapshots:
+            self.assertEqual(event, "snapshot")
+            self.assertEqual([r["temp"] for r in data["sensors"]], [20.0, 21.0, 22.0])
+        for messages in received:
+            (e1, d1), (e2, d2) = messages
+            self.assertEqual((e1, list(d1["sensors"]), d1["sensors"]["1"]["temp"]), ("delta", ["1"], 25.0))
+            self.assertEqual((e2, list(d2["sensors"]), d2["generation"]), ("delta", ["2"], d1["generation"] + 1))
+        self.assertEqual(hub.client_count, 0)
+
+    def test_slow_client_is_resynced_with_a_snapshot(self):
+        async def scenario():
+            hub = StreamHub()
+            hub.bind_loop(asyncio.get_running_loop())
+            client = hub.events(_Request())
+            await client.__anext__()
+            for i in range(stream.CLIENT_QUEUE_SIZE + 5): # Never read meanwhile
+                hub.publish(readings(float(i)), NOW)
+            await asyncio.sleep(0.05) # Let the fan-out callbacks run
+            first = parse(await client.__anext__())
+            await client.aclose()
+            return first
+
+        event, data = self.run_async(scenario())
+        self.assertEqual(event, "snapshot")
+        self.assertEqual(data["sensors"][0]["temp"], float(stream.CLIENT_QUEUE_SIZE + 4))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import tempfile
+import threading
+import time
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add backend to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+import weather
+from weather import WeatherManager, OFFLINE_WEATHER, interpolate_hourly
+
+MANUAL_LOCATION = {"auto": False, "latitude": 36.17, "longitude": -115.14, "name": "Las Vegas"}
+
+def _weather_response(temp):
+    resp = MagicMock()
+    resp.json.return_value = {"current": {"temperature_2m": temp, "weather_code": 1}}
+    return resp
+
+@patch('config.CONFIG.get', side_effect=lambda key, default=None: MANUAL_LOCATION if key == "location" else default)
+class TestWeatherCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_path = os.path.join(tempfile.mkdtemp(), "weather_cache.json")
+
+    def test_cached_reads_never_block_and_refresh_once(self, _config):
+        mgr = WeatherManager(cache_path=self.cache_path)
+        with patch('requests.Session.get') as mock_get:
+            def slow_fetch(*args, **kwargs):
+                time.sleep(0.3)
+                return _weather_response(71.5)
+            mock_get.side_effect = slow_fetch
+
+            t0 = time.perf_counter()
+            self.assertEqual(mgr.get_cached(), OFFLINE_WEATHER)
+            started = [mgr.refresh_in_background() for _ in range(10)]
+            self.assertLess(time.perf_counter() - t0, 0.1)
+            self.assertEqual(started.count(True), 1)
+
+            deadline = time.time() + 2
+            while mgr._refreshing and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(mock_get.call_count, 1)
+            self.assertEqual(mgr.get_cached()["temp"], 71.5)
+            self.assertFalse(mgr.get_cached()["stale"])
+
+    def test_last_known_good_survives_restart(self, _config):
+        with patch('requests.Session.get', return_value=_weather_response(64.0)):
+            WeatherManager(cache_path=self.cache_path).get_weather()
+
+        with patch('requests.Session.get') as mock_get:
+            mgr = WeatherManager(cache_path=self.cache_path)
+            self.assertEqual(mgr.get_cached()["temp"], 64.0)
+            self.assertFalse(mgr.refresh_due()) # Fetched moments ago
+            mock_get.assert_not_called()
+
+class TestForecast(unittest.TestCase):
+    HOURLY = {
+        "time": [3600, 7200, 10800],
+        "temperature_2m": [60.0, 70.0, 65.0],
+        "relative_humidity_2m": [40, 20, 30],
+        "weather_code": [0, 3, 61],
+    }
+
+    def test_interpolates_between_hours(self):
+        self.assertEqual(interpolate_hourly(self.HOURLY, 5400),
+                         {"weather_code": 0, "temperature_2m": 65.0, "relative_humidity_2m": 30.0})
+        self.assertEqual(interpolate_hourly(self.HOURLY, 7200)["weather_code"], 3)
+        self.assertIsNone(interpolate_hourly(self.HOURLY, 100))
+        self.assertIsNone(interpolate_hourly(self.HOURLY, 10800))
+
+    @patch('config.CONFIG.get', side_effect=lambda key, default=None: MANUAL_LOCATION if key == "location" else default)
+    def test_served_between_refreshes_from_one_fetch(self, _config):
+        now = time.time()
+        base = now - now % 3600
+        resp = MagicMock()
+        resp.json.return_value = {
+            # The observation differs from the forecast for this hour
+            "current": {"temperature_2m": 55.0, "relative_humidity_2m": 45, "weather_code": 2},
+            "hourly": {"time": [base + h * 3600 for h in range(48)],
+                       "temperature_2m": [60.0 + h for h in range(48)],
+                       "relative_humidity_2m": [40] * 48,
+                       "weather_code": [0] * 48},
+        }
+        cache_path = os.path.join(tempfile.mkdtemp(), "weather_cache.json")
+        mgr = WeatherManager(cache_path=cache_path)
+        with patch('requests.Session.get', return_value=resp) as mock_get:
+            mgr.get_weather()
+            fetched = mgr._last_weather_time
+            at_fetch = mgr._view(fetched)
+            self.assertEqual((at_fetch["temp"], at_fetch["humidity"], at_fetch["code"]), (55.0, 45, 2))
+
+            # Half an hour on: the forecast rose 0.5 degrees since the fetch
+            view = mgr._view(fetched + 1800)
+            self.assertEqual((view["temp"], view["humidity"], view["code"]), (55.5, 45, 2))
+            next_hour = view["forecast"][0]["time"]
+            self.assertEqual(next_hour, base + 3600 * (int(fetched + 1800 - base) // 3600 + 1))
+            self.assertEqual(view["forecast"][0], {"time": next_hour, "temp": 60.0 + (next_hour - base) // 3600, "code": 0})
+            self.assertEqual(len(view["forecast"]), 12)
+
+            # Switching away and back to the same spot reuses the cached forecast
+            mgr.reload_config()
+            mgr.get_weather()
+            self.assertEqual(mock_get.call_count, 1)
+            _, kwargs = mock_get.call_args
+            self.assertIn("hourly", kwargs["params"])
+
+        with open(cache_path) as f:
+            self.assertIn("36.17,-115.14", json.load(f))
+
+class _StubUpstream(BaseHTTPRequestHandler):
+    """Slow fake of ip-api (/json/) and Open-Meteo (/forecast) that counts hits."""
+    hits = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        with self.lock:
+            self.hits[path] = self.hits.get(path, 0) + 1
+        time.sleep(0.2)
+        if path == "/json/":
+            body = {"status": "success", "lat": 44.06, "lon": -121.32, "city": "Bend", "timezone": None}
+        else:
+            body = {"current": {"temperature_2m": 58.0, "weather_code": 3}}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+class TestWeatherCoalescing(unittest.TestCase):
+    def setUp(self):
+        _StubUpstream.hits = {}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubUpstream)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        for target, value in (("OPEN_METEO_URL", base + "/forecast"), ("IP_API_URL", base + "/json/")):
+            p = patch.object(weather, target, value)
+            p.start()
+            self.addCleanup(p.stop)
+        auto = {"auto": True, "latitude": 36.17, "longitude": -115.14, "name": "Las Vegas"}
+        p = patch('config.CONFIG.get', side_effect=lambda key, default=None: auto if key == "location" else default)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_parallel_callers_share_one_upstream_request(self):
+        mgr = WeatherManager(cache_path=os.path.join(tempfile.mkdtemp(), "weather_cache.json"))
+        barrier = threading.Barrier(25)
+        results = []
+
+        def caller():
+            barrier.wait()
+            results.append(mgr.get_weather())
+
+        threads = [threading.Thread(target=caller) for _ in range(24)]
+        for t in threads:
+            t.start()
+        barrier.wait()
+        mgr.refresh_in_background() # The poll loop joins in too
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(_StubUpstream.hits, {"/json/": 1, "/forecast": 1})
+        self.assertEqual(len(results), 24)
+        self.assertTrue(all(r["temp"] == 58.0 and r["location_name"] == "Bend" for r in results))
+
+if __name__ == '__main__':
+    unittest.main()